@@ -45,10 +45,17 @@ INSTALLED_APPS = [
     'app'
 ]
 
+# Build request.user from JWT claims instead of loading it (no user query per API request); changes to a
+# user's claims, password or active flag revoke their tokens through the revocation cache
+JWT_TOKEN_USERS = os.environ.get('JWT_TOKEN_USERS', 'False') == 'True'
+JWT_REVOCATION_CACHE_ALIAS = 'revocations'  # Shared and persistent; see CACHES
+TEST_RUNNER = 'Movie_Review_API.test_runner.IsolatedCachesTestRunner'  # Tests get their own revocation store
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT with cached user lookups, or with the user rebuilt from the token's claims
+        'app.authentication.TokenUserJWTAuthentication' if JWT_TOKEN_USERS else 'app.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication', 
     ),
         'DEFAULT_PERMISSION_CLASSES': [
@@ -60,6 +67,8 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=365),  # 1 year
     'REFRESH_TOKEN_LIFETIME': timedelta(days=365),  # 1 year
+    'TOKEN_OBTAIN_SERIALIZER': 'app.authentication.ClaimsTokenObtainPairSerializer',  # Adds the TokenUser claims
+    'TOKEN_REFRESH_SERIALIZER': 'app.authentication.RevocationCheckingTokenRefreshSerializer',  # No refresh after logout
 }
 
 MIDDLEWARE = [
@@ -68,12 +77,13 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.routers.ReplicaStickinessMiddleware',  # Read-your-writes with DATABASE_REPLICAS
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 AUTHENTICATION_BACKENDS = [
-    'app.backends.EmailBackend',  # Custom email backend
-    'django.contrib.auth.backends.ModelBackend',  # Default backend
+    'app.backends.EmailBackend',  # Email login (the USERNAME_FIELD) with cached user lookups and permissions
+    'django.contrib.auth.backends.ModelBackend',  # Sessions logged in before EmailBackend stay valid
 ]
 ROOT_URLCONF = 'Movie_Review_API.urls'
 
@@ -99,14 +109,166 @@ WSGI_APPLICATION = 'Movie_Review_API.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE=postgresql for production (pip install "psycopg[binary,pool]"); SQLite otherwise
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASE_POOL = os.environ.get('DATABASE_POOL', 'True') == 'True'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'movie_reviews'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Pooled connections are handed back to the pool after each request, so they must not also be persistent
+            'CONN_MAX_AGE': 0 if DATABASE_POOL else int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,  # Replace persistent connections that died between requests
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 20)),  # Per process
+                    'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),  # Seconds to wait for a free connection
+                },
+            } if DATABASE_POOL else {},
+        }
+    }
+else:
+    # Single-node profile. IMMEDIATE transactions take the write lock up front, so
+    # concurrent writers wait on busy_timeout instead of failing with "database is
+    # locked" mid-transaction. WAL (opt-in: it is stored in the database file and
+    # leaves -wal/-shm files next to it) also lets readers run alongside the writer
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', 'False') == 'True'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,  # Seconds to wait for the write lock
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    (
+                        'PRAGMA journal_mode=WAL;'
+                        'PRAGMA synchronous=NORMAL;'  # Durable across application crashes; fsync at checkpoints
+                    ) if SQLITE_WAL else ''
+                ) + (
+                    'PRAGMA cache_size=-20000;'  # 20 MB page cache per connection
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA mmap_size=134217728;'  # 128 MB
+                ),
+            },
+        }
+    }
+
+# Read replicas: comma-separated SQLite files, or PostgreSQL hosts (same name/credentials as the primary).
+# Review list/detail/comment reads and the home page go to a replica, except for clients that wrote recently
+
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME' if DATABASE_ENGINE == 'sqlite' else 'HOST': replica.strip(),
+        'TEST': {'MIRROR': 'default'},  # Tests read the rows they wrote
     }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['app.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))  # Longer than the expected replication lag
+REPLICA_PIN_CACHE_ALIAS = 'replica_pins'  # Shared between processes, or a write on one worker is not seen by the next
+
+
+# Authenticated users are cached per id for session and JWT requests; entries are dropped when a user is saved
+AUTH_USER_CACHE_ENABLED = os.environ.get('AUTH_USER_CACHE_ENABLED', 'True') == 'True'
+AUTH_USER_CACHE_ALIAS = 'default'  # May be per process: other processes learn of changes through the revocation list
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 300))  # Seconds
+AUTH_REVOCATION_CHECK_INTERVAL = 5  # Seconds a process reuses a user's revocation markers; changes elsewhere show up this late
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared tier for OMDb lookups, visible to every worker process on the host
+    'omdb': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('OMDB_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'omdb')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Anonymous API responses. Per process by default; use the file backend (LOCATION = a directory)
+    # or django.core.cache.backends.redis.RedisCache (LOCATION = redis://...) to share them between processes
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+    },
+    # Revoked JWTs and users. Entries must outlive the tokens (up to REFRESH_TOKEN_LIFETIME), survive
+    # restarts and be seen by every process, so this is never a per-process cache and never culls.
+    # The file backend covers one host; point it at Redis (or a database cache) when running several.
+    'revocations': {
+        'BACKEND': os.environ.get('JWT_REVOCATION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('JWT_REVOCATION_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'revocations')),
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 9},  # Culling would silently un-revoke tokens
+    },
+    # Users who wrote in the last REPLICA_STICKY_SECONDS and read from the primary. Every worker
+    # must see them; the file backend covers one host, use Redis when running several
+    'replica_pins': {
+        'BACKEND': os.environ.get('REPLICA_PIN_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('REPLICA_PIN_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'replica_pins')),
+    },
 }
 
 
+# OMDb movie metadata
+
+OMDB_URL = os.environ.get('OMDB_URL', 'http://www.omdbapi.com/')
+OMDB_API_KEY = os.environ.get('OMDB_API_KEY', '77f03f24')
+OMDB_CACHE_ALIAS = 'omdb'
+OMDB_CACHE_TTL = int(os.environ.get('OMDB_CACHE_TTL', 60 * 60 * 24 * 7))  # Movie metadata rarely changes: 1 week
+OMDB_NEGATIVE_CACHE_TTL = int(os.environ.get('OMDB_NEGATIVE_CACHE_TTL', 60 * 60))  # "Movie not found": 1 hour
+OMDB_LOCAL_CACHE_SIZE = 1024  # Entries kept in each process' in-memory LRU
+OMDB_MAX_WORKERS = 8  # Concurrent lookups when resolving a bulk review upload
+OMDB_BULK_DEADLINE = 10  # Seconds a bulk upload waits for OMDb before saving without posters
+OMDB_POOL_SIZE = 10  # Keep-alive connections kept open to OMDb
+OMDB_CONNECT_TIMEOUT = 3.05  # Seconds
+OMDB_READ_TIMEOUT = 5  # Seconds
+OMDB_RETRIES = 2  # Extra attempts after a connection error, timeout or 5xx
+OMDB_RETRY_BACKOFF = 0.2  # Seconds before the first retry, doubled for each further one
+OMDB_BREAKER_THRESHOLD = 5  # Consecutive failed lookups that open the circuit breaker
+OMDB_BREAKER_RESET_TIMEOUT = 30  # Seconds the breaker stays open before a trial request
+ENRICH_REVIEWS_ASYNC = os.environ.get('ENRICH_REVIEWS_ASYNC', 'True') == 'True'  # Fetch posters in the background worker
+
+
+# Reviews
+
+REVIEW_COMMENTS_EMBEDDED = 3  # Latest comments embedded in each review payload (override with ?comments=N)
+REVIEW_COMMENTS_MAX_EMBEDDED = 20
+REVIEW_EXPORT_CHUNK_SIZE = 2000  # Rows fetched from the database at a time when exporting
+
+
+# Response cache for anonymous reads
+
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # Seconds a cached response is served as fresh
+RESPONSE_CACHE_STALE_TTL = 30  # Seconds an expired response is still served while one request rebuilds it
+RESPONSE_CACHE_LOCK_TIMEOUT = 10  # Seconds a rebuild holds its lock
+RESPONSE_CACHE_LOCK_WAIT = 2  # Seconds a cold miss waits for another request's rebuild before building its own
+
+
+# Background jobs (run with `python manage.py worker`)
+
+JOBS_RUN_EAGERLY = os.environ.get('JOBS_RUN_EAGERLY', 'False') == 'True'  # Run jobs inline instead of queueing them
+JOBS_WORKER_THREADS = 4
+JOBS_CLAIM_BATCH = 10  # Due jobs a worker tries to claim per poll
+JOBS_LEASE_SECONDS = 300  # Running jobs older than this are requeued; workers check this often
+JOBS_RETRY_BACKOFF = 30  # Seconds before the first retry, doubled for each further one
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -153,4 +315,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'app.User'
 LOGIN_URL = '/login'
 MEDIA_URL='/media/'
-MEDIA_ROOT=os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT=os.path.join(BASE_DIR, 'media')
+
+# Profile pictures are resized into square thumbnails (WebP and JPEG) by the background worker
+PROFILE_THUMBNAIL_SIZES = (64, 150, 300)  # Pixels
+PROFILE_THUMBNAIL_DISPLAY_SIZE = 150  # Shown on profile pages, with the next size up for 2x screens
+
+# How /media/ is served: 'django' streams files from Python, in DEBUG only; 'x-sendfile' (Apache
+# mod_xsendfile, lighttpd) or 'x-accel-redirect' (nginx) hand the file to the web server
+MEDIA_SERVING = os.environ.get('MEDIA_SERVING', 'django')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')  # nginx `internal` location aliasing MEDIA_ROOT
+MEDIA_CACHE_SECONDS = 60 * 60  # Uploads can be replaced under the same name
+MEDIA_IMMUTABLE_DIRS = ('profile_thumbnails/',)  # Content-hashed names: cached for a year
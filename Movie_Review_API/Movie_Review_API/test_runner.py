@@ -0,0 +1,35 @@
+"""
+Test runner for Movie_Review_API.
+
+Saving or deleting a user records it in the 'revocations' cache, and writes
+pin users to the primary in the 'replica_pins' cache; both are file caches
+by default. The tests get throwaway ones instead, so a test run never
+revokes the tokens of users in the developer's own database.
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class IsolatedCachesTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_location = tempfile.mkdtemp()
+        self.isolated_caches = override_settings(CACHES={**settings.CACHES, **{
+            alias: {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(self.cache_location, alias),
+            }
+            for alias in (settings.JWT_REVOCATION_CACHE_ALIAS, settings.REPLICA_PIN_CACHE_ALIAS)
+        }})
+        self.isolated_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.isolated_caches.disable()
+        shutil.rmtree(self.cache_location, True)
+        super().teardown_test_environment(**kwargs)
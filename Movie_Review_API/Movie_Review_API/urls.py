@@ -18,15 +18,19 @@ from django.contrib import admin
 from django.urls import path,include
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
+    TokenRefreshView,
 
 )
 from django.conf import settings
-from django.conf.urls.static import static
+from userprofile.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',include('app.urls')),
     path('auth', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('auth/refresh', TokenRefreshView.as_view(), name='token_refresh'),
 ]
-urlpatterns= urlpatterns + static (settings.MEDIA_URL,
-                                   document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Uploads, with cache headers. Python only streams them in development; in production
+# MEDIA_SERVING hands the bytes to the web server, or the web server serves MEDIA_ROOT itself
+if settings.DEBUG or settings.MEDIA_SERVING != 'django':
+    urlpatterns.append(path(settings.MEDIA_URL.lstrip('/') + '<path:path>', serve_media, name='media'))
\ No newline at end of file
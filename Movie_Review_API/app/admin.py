@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User,Review
+from .models import User,Review,Movie,Job
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'id',)
@@ -7,10 +7,22 @@ class UserAdmin(admin.ModelAdmin):
 admin.site.register(User, UserAdmin)
 
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ['user', 'movie_title', 'like_count', 'rating', 'id','poster_url']  # Add the custom like_count method
-    def like_count(self, obj):
-        return obj.liked_by.count()  # Count the number of users who liked the review
+    list_display = ['user', 'movie_title', 'like_count', 'comment_count', 'rating', 'id','poster_url']  # Stored counters, no per-row COUNT
+    list_select_related = ['user']
 
-    like_count.short_description = 'Like Count'  # Name the column in the admin panel
+    def save_model(self, request, obj, form, change):
+        obj.save(validated=True)  # The admin form already ran full_clean()
 
 admin.site.register(Review,ReviewAdmin)
+
+class MovieAdmin(admin.ModelAdmin):
+    list_display = ['title', 'year', 'imdb_id', 'fetched_at', 'id']
+    search_fields = ['title', 'imdb_id']
+
+admin.site.register(Movie, MovieAdmin)
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'key', 'status', 'attempts', 'run_after', 'updated_at']
+    list_filter = ['kind', 'status']
+
+admin.site.register(Job, JobAdmin)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Connect the model signal handlers
+        from . import checks  # noqa: F401  Register the system checks
+        # Register background job handlers from every installed app's tasks module
+        autodiscover_modules('tasks')
@@ -0,0 +1,147 @@
+# Standard library imports
+import time  # Revocation timestamps
+
+# Django imports
+from django.utils.translation import gettext_lazy as _  # Same messages as simplejwt
+
+# Third-party imports
+from rest_framework.exceptions import AuthenticationFailed  # Unknown, inactive or revoked user
+from rest_framework_simplejwt.authentication import JWTAuthentication  # Token parsing and validation
+from rest_framework_simplejwt.exceptions import InvalidToken  # Token without a user id
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer  # Login and refresh
+from rest_framework_simplejwt.settings import api_settings  # USER_ID_CLAIM and revocation settings
+from rest_framework_simplejwt.utils import get_md5_hash_password  # Password-change revocation check
+
+# Local app imports
+from .backends import get_cached_user  # Shared with session authentication
+from .backends import revocation_cache, revoked_user_key  # Also read by the user cache
+from .models import User, TokenUser  # Claims copied into tokens, and the user rebuilt from them
+
+AUTH_TIME_CLAIM = 'auth_time'  # When the user logged in; copied from refresh to access tokens
+
+
+def _revoked_token_key(jti):
+    return f'auth:revoked:jti:{jti}'
+
+
+def _revoked_login_key(user_id, auth_time):
+    return f'auth:revoked:login:{user_id}:{auth_time}'
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject every token issued to this user up to now, e.g. after a password,
+    permission or username change. Kept as long as a token can live.
+    """
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    revocation_cache().set(revoked_user_key(user_id), time.time(), int(lifetime.total_seconds()))
+
+
+def revoke_token(token):
+    """
+    Log a token out. Every token of the same login (the refresh token and
+    any access token minted from it, which share `auth_time`) is rejected
+    until the refresh token would have expired; tokens from before the
+    auth_time claim are revoked by jti alone.
+    """
+    cache = revocation_cache()
+    if AUTH_TIME_CLAIM in token:
+        key = _revoked_login_key(token[api_settings.USER_ID_CLAIM], token[AUTH_TIME_CLAIM])
+        expires = token[AUTH_TIME_CLAIM] + api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+    else:
+        key = _revoked_token_key(token[api_settings.JTI_CLAIM])
+        expires = token['exp']
+    remaining = expires - time.time()
+    if remaining > 0:
+        cache.set(key, True, int(remaining) + 1)
+
+
+def check_revoked(token):
+    """
+    Raise AuthenticationFailed for a token on the revocation list: revoked
+    itself, part of a revoked login, or issued before its user was revoked.
+    """
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    auth_time = token.get(AUTH_TIME_CLAIM)
+    user_key = revoked_user_key(user_id)
+    token_key = _revoked_token_key(token.get(api_settings.JTI_CLAIM))
+    login_key = _revoked_login_key(user_id, auth_time)
+    revoked = revocation_cache().get_many([user_key, token_key, login_key])  # One cache round trip
+    if revoked.get(token_key) or (auth_time is not None and revoked.get(login_key)):
+        raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+    revoked_at = revoked.get(user_key)
+    # Timestamps in tokens are whole seconds: a token from the second of the revocation is rejected too
+    issued_at = auth_time if auth_time is not None else token.get('iat', 0)
+    if revoked_at is not None and issued_at <= int(revoked_at):
+        raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login serializer that puts what the views need to know about the user
+    in the tokens, so TokenUserJWTAuthentication can rebuild it without a query.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for field in User.TOKEN_CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        token[AUTH_TIME_CLAIM] = token['iat']
+        return token
+
+
+class RevocationCheckingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuse to mint access tokens from a revoked refresh token (logout, or a
+    user revoked since the login).
+    """
+
+    def validate(self, attrs):
+        check_revoked(self.token_class(attrs['refresh']))
+        return super().validate(attrs)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through the user cache
+    instead of querying the user table on every request, and honours the
+    revocation list.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        check_revoked(validated_token)
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+
+class TokenUserJWTAuthentication(CachedJWTAuthentication):
+    """
+    Build request.user from the token's claims (a TokenUser) instead of
+    loading it. Deactivations and claim changes reach it through the
+    revocation list; tokens issued before the claims were added fall back
+    to the cached lookup.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or any(field not in validated_token for field in User.TOKEN_CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        return TokenUser.from_claims(user_id, validated_token)
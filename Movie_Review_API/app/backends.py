@@ -1,23 +1,111 @@
+# Standard library imports
+import time  # When a user was cached, compared with their revocation
+
 # Django authentication imports
-from django.contrib.auth.backends import BaseBackend  # Base class for creating custom authentication backends
+from django.conf import settings  # User cache alias and lifetime, revocation cache alias
+from django.contrib.auth.backends import ModelBackend  # Permission checks and the inactive-user rule
 from django.contrib.auth import get_user_model  # Function to get the current user model (support for custom user models)
+from django.core.cache import caches  # Shared user cache
+from django.core.exceptions import PermissionDenied  # Stop authenticate() after a failed email login
+
+# Local app imports
+from .omdb import LocalTTLCache  # Recently read revocation markers, per process
 
 
 User = get_user_model()
 
-class EmailBackend(BaseBackend):
-    def authenticate(self, request, email=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return None
+# User id -> newest revocation or change marker, re-read every AUTH_REVOCATION_CHECK_INTERVAL
+# seconds, so cache hits do not read the shared revocation store on every request
+_revocation_checks = LocalTTLCache(max_size=10000)
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def revoked_user_key(user_id):
+    return f'auth:revoked:user:{user_id}'
+
+
+def changed_user_key(user_id):
+    return f'auth:changed:user:{user_id}'
+
+
+def revocation_cache():
+    return caches[settings.JWT_REVOCATION_CACHE_ALIAS]
+
 
-        if user.check_password(password):
+def mark_user_changed(user_id):
+    """
+    Tell other processes to reload their cached copy of a user whose change
+    does not revoke tokens. Only needed while such a copy can live.
+    """
+    revocation_cache().set(changed_user_key(user_id), time.time(), settings.AUTH_USER_CACHE_TTL)
+
+
+def _newest_marker(user_id):
+    found, newest = _revocation_checks.get(user_id)
+    if not found:
+        markers = revocation_cache().get_many([revoked_user_key(user_id), changed_user_key(user_id)])
+        newest = max(markers.values(), default=None)
+        _revocation_checks.set(user_id, newest, settings.AUTH_REVOCATION_CHECK_INTERVAL)
+    return newest
+
+
+def get_cached_user(user_id):
+    """
+    Resolve a user id to a User, from the cache when possible, so session and
+    JWT authentication do not query the user table on every request. Saving
+    or deleting a user drops the entry in this process (see signals.py);
+    other processes see the change through the shared revocation list,
+    where every change to a tracked field is recorded as a revocation or a
+    plain change, and reload entries cached before it. Each process reads
+    a user's markers at most every AUTH_REVOCATION_CHECK_INTERVAL seconds.
+    """
+    if not settings.AUTH_USER_CACHE_ENABLED:
+        return User._default_manager.filter(pk=user_id).first()
+    cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+    key = _user_key(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        user, cached_at = cached
+        newest = _newest_marker(user_id)
+        if newest is None or newest < cached_at:
             return user
-        return None
+    cached_at = time.time()  # Before the read, so a revocation racing it reloads next time
+    user = User._default_manager.filter(pk=user_id).first()
+    if user is not None:
+        cache.set(key, (user, cached_at), settings.AUTH_USER_CACHE_TTL)
+    return user
 
-    def get_user(self, user_id):
+
+def forget_cached_user(user_id):
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(_user_key(user_id))
+
+
+class EmailBackend(ModelBackend):
+    """
+    Log users in with their email address, which is also the USERNAME_FIELD:
+    the admin and JWT login (which pass it as `username`/`email`) and
+    my_login all end up here. A failed email login stops authenticate(), so
+    ModelBackend, listed after this only for sessions it logged in, does
+    not look the user up again.
+    """
+
+    def authenticate(self, request, email=None, password=None, username=None, **kwargs):
+        email = email or username
+        if not email or password is None:
+            return None  # Not an email login; nothing to look up
         try:
-            return User.objects.get(pk=user_id)
+            user = User._default_manager.get(email=email)
         except User.DoesNotExist:
-            return None
+            # Hash anyway so a missing account takes as long as a wrong password
+            User().set_password(password)
+            raise PermissionDenied
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        raise PermissionDenied
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,178 @@
+# Standard library imports
+import asyncio  # Lock polling in the async views
+import hashlib  # Compact cache keys for arbitrary query strings
+import time  # Freshness deadlines and lock polling
+import uuid  # Generation tokens
+
+# Django imports
+from asgiref.sync import sync_to_async  # Cache keys for the async views
+from django.conf import settings  # Response cache settings
+from django.core.cache import caches  # Configurable cache backend
+
+# DRF (Django REST Framework) imports
+from rest_framework.response import Response  # Rebuild responses from cached data
+
+# Local app imports
+from .routers import primary_reads  # Cache misses are built from the primary
+
+
+# Invalidation scopes: bumping a scope's generation orphans every entry built under it
+REVIEWS = 'reviews'  # Review lists (any filter, ordering or page)
+LEADERBOARD = 'leaderboard'  # Home page movie leaderboard
+MOVIES = 'movies'  # OMDb details embedded in reviews
+
+
+def review_scope(review_id):
+    return f'review:{review_id}'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(scope):
+    return f'response:gen:{scope}'
+
+
+def generations(scopes):
+    """
+    Current generation token of each scope. Tokens are random rather than
+    counters, so an evicted generation can never come back with an old value
+    and revive stale entries.
+    """
+    cache = get_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def invalidate(*scopes):
+    """
+    Orphan every cached payload built under any of `scopes`.
+    """
+    get_cache().set_many({_generation_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def cache_key(name, scopes, params=None):
+    parts = [name, *generations(scopes)]
+    if params:
+        # Same parameters in any order share an entry
+        parts.append('&'.join(f'{key}={value}' for key, value in sorted(params.lists())))
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'response:{digest}'
+
+
+def cached_payload(name, scopes, build, params=None):
+    """
+    Return (payload, hit) for `name`, calling `build()` on a miss.
+
+    Entries stay fresh for RESPONSE_CACHE_TTL seconds and are then served
+    stale for up to RESPONSE_CACHE_STALE_TTL more while a single caller,
+    holding a short lock, rebuilds them. On a cold miss, callers that lose
+    the lock wait briefly for the winner's result instead of all hitting the
+    database at once. `build()` returns None for payloads that must not be cached.
+
+    `build()` reads from the primary: an entry outlives the request, and one
+    built from a lagging replica just after an invalidation would keep
+    serving the old rows until the next one. So while the response cache is
+    on, cached endpoints only use the replicas for authenticated requests.
+    """
+    cache = get_cache()
+    key = cache_key(name, scopes, params)
+    lock_key = f'{key}:lock'
+    lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+    entry = cache.get(key)
+    if entry is not None:
+        payload, fresh_until = entry
+        if time.time() < fresh_until or not cache.add(lock_key, 1, lock_timeout):
+            return payload, True  # Fresh, or stale while someone else rebuilds it
+    elif not cache.add(lock_key, 1, lock_timeout):
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0], True
+        # The rebuild is taking too long: build our own copy rather than fail
+
+    try:
+        with primary_reads():
+            payload = build()
+        if payload is not None:
+            ttl = settings.RESPONSE_CACHE_TTL
+            cache.set(key, (payload, time.time() + ttl), ttl + settings.RESPONSE_CACHE_STALE_TTL)
+    finally:
+        cache.delete(lock_key)
+    return payload, False
+
+
+async def acached_payload(name, scopes, abuild, params=None):
+    """
+    cached_payload() for async views: the same entries, lock and primary
+    reads, with `abuild` a coroutine function and every wait awaited.
+    """
+    cache = get_cache()
+    key = await sync_to_async(cache_key)(name, scopes, params)
+    lock_key = f'{key}:lock'
+    lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+
+    entry = await cache.aget(key)
+    if entry is not None:
+        payload, fresh_until = entry
+        if time.time() < fresh_until or not await cache.aadd(lock_key, 1, lock_timeout):
+            return payload, True
+    elif not await cache.aadd(lock_key, 1, lock_timeout):
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await cache.aget(key)
+            if entry is not None:
+                return entry[0], True
+
+    try:
+        with primary_reads():
+            payload = await abuild()
+        if payload is not None:
+            ttl = settings.RESPONSE_CACHE_TTL
+            await cache.aset(key, (payload, time.time() + ttl), ttl + settings.RESPONSE_CACHE_STALE_TTL)
+    finally:
+        await cache.adelete(lock_key)
+    return payload, False
+
+
+class CachedResponseMixin:
+    """
+    Serve anonymous GETs of a DRF list/retrieve view from the response cache,
+    keyed on the view, its URL kwargs and its query parameters. Views list the
+    invalidation scopes their data depends on in `get_cache_scopes()`.
+    """
+
+    def get_cache_scopes(self):
+        return [REVIEWS]
+
+    def get_cache_name(self):
+        # Pagination links are absolute, so the host is part of the key
+        kwargs = ':'.join(f'{key}={value}' for key, value in sorted(self.kwargs.items()))
+        return f'{type(self).__name__}:{self.request.get_host()}:{kwargs}'
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated or not settings.RESPONSE_CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
+
+        response = None
+
+        def build():
+            nonlocal response
+            response = super(CachedResponseMixin, self).get(request, *args, **kwargs)
+            return response.data if response.status_code == 200 else None
+
+        data, hit = cached_payload(self.get_cache_name(), self.get_cache_scopes(), build, request.query_params)
+        if response is None:
+            response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
@@ -0,0 +1,57 @@
+# Django imports
+from django.conf import settings  # Revocation cache, replica pin and media settings
+from django.core import checks  # System check framework
+
+# Cache backends whose entries live and die with one process
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.security)
+def check_revocation_cache(app_configs, **kwargs):
+    """
+    JWT revocations (logout, deactivated users, changed claims) must be seen
+    by every process and survive restarts, or revoked tokens work again.
+    Token-user mode relies on them entirely, so it refuses to start.
+    """
+    backend = settings.CACHES[settings.JWT_REVOCATION_CACHE_ALIAS]['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    message = f'JWT_REVOCATION_CACHE_ALIAS uses {backend}, which is per process and lost on restart.'
+    hint = 'Use a shared, persistent cache (file, Redis or database) for the revocation list.'
+    if settings.JWT_TOKEN_USERS:
+        return [checks.Error(message, hint=hint, id='app.E001')]
+    return [checks.Warning(message, hint=hint, id='app.W001')]
+
+
+@checks.register(checks.Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """
+    With read replicas, a client that wrote on one worker must be kept on the
+    primary by the others too, or it reads its own write from a lagging replica.
+    """
+    backend = settings.CACHES[settings.REPLICA_PIN_CACHE_ALIAS]['BACKEND']
+    if not settings.DATABASE_REPLICAS or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Warning(
+        f'REPLICA_PIN_CACHE_ALIAS uses {backend}, which other processes do not see.',
+        hint='Use a shared cache (file, Redis or database) for replica pins when running several processes.',
+        id='app.W003',
+    )]
+
+
+@checks.register(checks.Tags.urls, deploy=True)
+def check_media_serving(app_configs, **kwargs):
+    """
+    Outside DEBUG, Django does not stream uploads: without a web server
+    handoff, /media/ is not routed and the web server must serve MEDIA_ROOT.
+    """
+    if settings.DEBUG or settings.MEDIA_SERVING != 'django':
+        return []
+    return [checks.Warning(
+        "MEDIA_SERVING is 'django' with DEBUG off, so Django does not serve /media/.",
+        hint="Set MEDIA_SERVING to 'x-sendfile' or 'x-accel-redirect', or serve MEDIA_ROOT from the web server.",
+        id='app.W002',
+    )]
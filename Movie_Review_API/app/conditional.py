@@ -0,0 +1,72 @@
+# Standard library imports
+import functools  # Keep the decorated view's name
+import hashlib  # Compact ETags
+
+# Django imports
+from django.db.models.functions import Coalesce, Greatest  # Latest of the review and movie modification times
+from django.utils.decorators import method_decorator  # Apply Django's condition() to DRF handlers
+from django.views.decorators.http import condition  # If-None-Match / If-Modified-Since handling
+
+# Local app imports
+from .models import Review  # Versioned by Review.updated_at
+
+
+def _last_modified_query(pk):
+    return Review.objects.filter(pk=pk).values_list(
+        Greatest('updated_at', Coalesce('movie__fetched_at', 'updated_at')), flat=True,
+    )
+
+
+def review_last_modified(request, pk, **kwargs):
+    """
+    When a review's payload last changed: its own row (comments, likes and
+    poster updates all bump `updated_at`) or the movie details embedded in it.
+    Looked up once per request with a single primary-key query.
+    """
+    cache = request.__dict__.setdefault('_review_last_modified', {})
+    if pk not in cache:
+        cache[pk] = _last_modified_query(pk).first()
+    return cache[pk]
+
+
+async def areview_last_modified(request, pk, **kwargs):
+    cache = request.__dict__.setdefault('_review_last_modified', {})
+    if pk not in cache:
+        cache[pk] = await _last_modified_query(pk).afirst()
+    return cache[pk]
+
+
+def review_etag(request, pk, **kwargs):
+    # Different query parameters (?comments=, cursors, page sizes) are different representations
+    last_modified = review_last_modified(request, pk)
+    if last_modified is None:
+        return None  # Let the view answer 404
+    version = f'{pk}|{last_modified.isoformat()}|{request.META.get("QUERY_STRING", "")}'
+    return hashlib.sha1(version.encode()).hexdigest()
+
+
+class ConditionalReviewMixin:
+    """
+    Answer GETs of a review resource with ETag/Last-Modified headers, and with
+    304 Not Modified when the client's copy is current, without running the
+    queryset or the serializer. Runs after authentication and permission checks.
+    """
+
+    @method_decorator(condition(etag_func=review_etag, last_modified_func=review_last_modified))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+def conditional_review(view):
+    """
+    ConditionalReviewMixin for async function views taking a review `pk`.
+    The version is looked up with the async ORM first, so Django's
+    condition() finds it in the per-request cache instead of querying.
+    """
+    conditional_view = condition(etag_func=review_etag, last_modified_func=review_last_modified)(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, pk, *args, **kwargs):
+        await areview_last_modified(request, pk)
+        return await conditional_view(request, pk, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,89 @@
+# Standard library imports
+import csv  # CSV export
+import json  # NDJSON export
+
+# Django imports
+from django.conf import settings  # Export chunk size
+from django.core.serializers.json import DjangoJSONEncoder  # Datetimes in NDJSON rows
+from django.db.models import F  # Author columns from the joined user table
+
+# DRF (Django REST Framework) imports
+from rest_framework.negotiation import BaseContentNegotiation  # Exports pick their own content type
+
+# Local app imports
+from .models import Review  # Exported rows
+
+
+# Columns of an exported review, in CSV header order
+EXPORT_FIELDS = [
+    'id', 'movie_title', 'review_content', 'rating', 'username', 'email', 'poster_url',
+    'like_count', 'comment_count', 'created_at', 'updated_at',
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_queryset(movie_title=None, rating=None):
+    """
+    Reviews to export as plain dicts, in primary key order so an export can be
+    compared or resumed. Only the exported columns are selected.
+    """
+    queryset = Review.objects.order_by('id')
+    if movie_title:
+        queryset = queryset.filter(movie_title=movie_title)
+    if rating is not None:
+        queryset = queryset.filter(rating=rating)
+    return queryset.values(
+        'id', 'movie_title', 'review_content', 'rating', 'poster_url', 'like_count', 'comment_count',
+        'created_at', 'updated_at', username=F('user__username'), email=F('user__email'),
+    )
+
+
+def export_rows(queryset, chunk_size=None):
+    # .iterator() streams rows from the database cursor instead of caching the whole result
+    return queryset.iterator(chunk_size=chunk_size or settings.REVIEW_EXPORT_CHUNK_SIZE)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps({field: row[field] for field in EXPORT_FIELDS}, cls=DjangoJSONEncoder) + '\n'
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer produces
+    lines for a streaming response instead of buffering them.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            row[field].isoformat() if hasattr(row[field], 'isoformat') else row[field] for field in EXPORT_FIELDS
+        ])
+
+
+def export_lines(file_format, rows):
+    return ndjson_lines(rows) if file_format == 'ndjson' else csv_lines(rows)
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Exports are streamed in the format named in the URL, so an Accept header
+    such as text/csv must not be rejected by DRF's renderer negotiation.
+    Error responses still use the first configured renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
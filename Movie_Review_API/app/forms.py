@@ -1,6 +1,6 @@
 # Django imports
 from django import forms  # For creating and handling forms
-from django.contrib.auth.models import User  # Default user model in Django
+from django.contrib.auth import get_user_model  # Function to get the current user model (support for custom user models)
 from django.core.exceptions import ValidationError  # For handling validation errors in forms
 
 
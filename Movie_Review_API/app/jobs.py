@@ -0,0 +1,168 @@
+# Standard library imports
+import logging  # Report job failures
+import time  # Lease release cadence
+import traceback  # Keep the failing traceback on the job row
+from datetime import timedelta  # Retry backoff and lease expiry
+
+# Django imports
+from django.conf import settings  # Job queue settings
+from django.db import close_old_connections, transaction, IntegrityError  # Stale connections; requeue conflicts
+from django.db.models import F  # Atomic attempt counter
+from django.utils import timezone  # Timestamps for claiming and scheduling jobs
+
+# Local app imports
+from .models import Job  # Database-backed job rows
+
+
+logger = logging.getLogger(__name__)
+
+handlers = {}
+
+
+class RetryJob(Exception):
+    """
+    Raised by a handler when the work could not be done yet (e.g. OMDb is down)
+    and the job should be retried later.
+    """
+
+
+def register(kind):
+    """
+    Decorator registering a function as the handler for jobs of `kind`.
+    Handlers receive the job payload and must be idempotent: a job can run
+    more than once if a worker dies mid-way.
+    """
+    def decorator(func):
+        handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, key, payload=None):
+    """
+    Queue a job, or run it at once when JOBS_RUN_EAGERLY is set (tests and
+    development setups without a worker).
+    """
+    job = Job.objects.enqueue(kind, key, payload)
+    if settings.JOBS_RUN_EAGERLY:
+        while claim(job.pk):  # Again if the job was enqueued while it ran
+            run(Job.objects.get(pk=job.pk))
+    return job
+
+
+def enqueue_many(kind, payloads):
+    """
+    Queue one job per {key: payload} with a single INSERT (see enqueue()).
+    """
+    Job.objects.enqueue_many(kind, payloads)
+    if settings.JOBS_RUN_EAGERLY:
+        keys = [str(key) for key in payloads]
+        for job_id in Job.objects.filter(kind=kind, key__in=keys, status=Job.PENDING).values_list('id', flat=True):
+            while claim(job_id):
+                run(Job.objects.get(pk=job_id))
+
+
+def claim(job_id):
+    """
+    Move a pending job that is due to running. Returns False if another worker
+    got it first, or if it is waiting out a retry backoff.
+    """
+    return Job.objects.filter(pk=job_id, status=Job.PENDING, run_after__lte=timezone.now()).update(
+        status=Job.RUNNING,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        updated_at=timezone.now(),
+    ) == 1
+
+
+def claim_next():
+    """
+    Claim the oldest job that is due, or return None when the queue is empty.
+    """
+    due = Job.objects.filter(status=Job.PENDING, run_after__lte=timezone.now()).order_by('run_after')
+    for job_id in due.values_list('id', flat=True)[:settings.JOBS_CLAIM_BATCH]:
+        if claim(job_id):
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def release_expired():
+    """
+    Put running jobs whose worker disappeared (lease expired) back in the queue.
+    """
+    expired = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=expired).update(
+        status=Job.PENDING, locked_at=None, rerun=False, updated_at=timezone.now(),
+    )
+
+
+def run(job):
+    """
+    Execute a claimed job and record the outcome, scheduling a retry with
+    exponential backoff when it fails and attempts remain.
+    """
+    handler = handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        handler(**job.payload)
+    except Exception as exc:
+        job.last_error = traceback.format_exc() if not isinstance(exc, RetryJob) else str(exc)
+        job.locked_at = None
+        if job.attempts < job.max_attempts and handler is not None:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=settings.JOBS_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+            job.rerun = False  # The retry covers any enqueue that came in meanwhile
+            job.save(update_fields=['status', 'run_after', 'locked_at', 'last_error', 'rerun', 'updated_at'])
+        else:
+            job.status = Job.FAILED
+            logger.error("Job %s failed after %d attempts: %s", job, job.attempts, exc)
+            job.save(update_fields=['status', 'run_after', 'locked_at', 'last_error', 'updated_at'])
+            requeue_if_enqueued(job, attempts=0)
+        return False
+
+    # Conditional, so an enqueue flagging the job now is either seen here or creates a new job
+    if not Job.objects.filter(pk=job.pk, rerun=False).update(
+        status=Job.DONE, locked_at=None, last_error='', updated_at=timezone.now(),
+    ):
+        requeue_if_enqueued(job)
+    return True
+
+
+def requeue_if_enqueued(job, **changes):
+    """
+    Put a job that was enqueued again while it ran back in the queue: it may
+    have passed the data the new request is about before that was written.
+    """
+    try:
+        with transaction.atomic():
+            return Job.objects.filter(pk=job.pk, rerun=True).update(
+                status=Job.PENDING, locked_at=None, rerun=False, run_after=timezone.now(), updated_at=timezone.now(),
+                **changes,
+            )
+    except IntegrityError:
+        return 0  # A new job for the same key was queued in the meantime and covers it
+
+
+def work(stop_event, poll_interval=1.0, once=False):
+    """
+    Worker loop: claim and run jobs until `stop_event` is set, sleeping
+    `poll_interval` seconds whenever the queue is empty. With `once`, return as
+    soon as the queue is drained. Jobs left running by a worker that died are
+    requeued at start and then every JOBS_LEASE_SECONDS.
+    """
+    next_release = time.monotonic()
+    while not stop_event.is_set():
+        close_old_connections()
+        if time.monotonic() >= next_release:
+            released = release_expired()
+            if released:
+                logger.warning("Requeued %d job(s) whose lease expired", released)
+            next_release = time.monotonic() + settings.JOBS_LEASE_SECONDS
+        job = claim_next()
+        if job is None:
+            if once:
+                return
+            stop_event.wait(poll_interval)
+            continue
+        run(job)
@@ -0,0 +1,63 @@
+"""
+The client processes of benchmark_concurrency.
+
+They live apart from the command so that a spawned client (there is no fork
+on Windows) can import this module before Django is set up: models are only
+imported once the process has called django.setup().
+"""
+
+# Standard library imports
+import random  # Mix of operations per client
+import time  # Timing
+
+# Django imports
+import django  # Set up spawned clients
+from django.apps import apps  # Is Django already set up (forked) or not (spawned)?
+from django.db import connection, transaction, OperationalError  # Per-process connection and lock errors
+
+
+def run_client(user_id, reviews, write_ratio, duration, queue):
+    if not apps.ready:
+        django.setup()  # Spawned: DJANGO_SETTINGS_MODULE comes from the parent's environment
+    from app.models import Review  # Benchmark data
+    from app.views import reviews_with_comments  # The query behind the review endpoints
+
+    latencies = {'read': [], 'like': [], 'comment': []}
+    errors = {}
+    rng = random.Random(user_id)
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            review_id = rng.choice(reviews)
+            if rng.random() >= write_ratio:
+                kind, operation = 'read', lambda: list(reviews_with_comments(Review.objects.filter(pk=review_id)))
+            elif rng.random() < 0.5:
+                kind, operation = 'like', lambda: toggle_like(review_id, user_id)
+            else:
+                kind, operation = 'comment', lambda: comment(review_id, user_id)
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError as exc:
+                errors[str(exc)] = errors.get(str(exc), 0) + 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+    finally:
+        connection.close()
+        queue.put((latencies, errors))
+
+
+def toggle_like(review_id, user_id):
+    from app.models import Review
+
+    liked, _ = Review.objects.add_like(review_id, user_id)
+    if not liked:
+        Review.objects.remove_like(review_id, user_id)
+
+
+def comment(review_id, user_id):
+    from reviewcomment.models import ReviewComment
+
+    # Same writes as ReviewCommentCreateView
+    with transaction.atomic():
+        ReviewComment.objects.create(review_id=review_id, user_id=user_id, comment='Benchmark')
@@ -0,0 +1,103 @@
+# Standard library imports
+import multiprocessing  # Concurrent client processes
+import statistics  # Latency percentiles
+import time  # Timing
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError  # Base class for management commands
+from django.db import connections  # Per-process connections
+
+# Local app imports
+from app.models import Review, User  # Benchmark data
+from app.management.commands._benchmark_client import run_client  # What each client process runs
+
+BENCH_PREFIX = 'bench-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent review reads, like/unlike toggles and comment writes against the configured '
+        'database and report throughput, latency and lock errors. Run it under each database profile '
+        '(e.g. the default rollback journal, SQLITE_WAL=True, DATABASE_ENGINE=postgresql) to compare them. '
+        'It creates and deletes bench-* users, reviews, likes and comments, so point it at a scratch '
+        'database (SQLITE_PATH, POSTGRES_DB) and pass --allow-writes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent client processes.')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run.')
+        parser.add_argument('--reviews', type=int, default=20, help='Reviews the clients work on.')
+        parser.add_argument('--write-ratio', type=float, default=0.5, help='Share of operations that write.')
+        parser.add_argument('--allow-writes', action='store_true',
+                            help='Confirm that the configured database may be written to.')
+
+    def handle(self, *args, **options):
+        if not options['allow_writes']:
+            settings_dict = connections['default'].settings_dict
+            raise CommandError(
+                f"This benchmark writes to {connections['default'].vendor} database {settings_dict['NAME']}. "
+                'Point SQLITE_PATH or POSTGRES_DB at a scratch database and pass --allow-writes.'
+            )
+        users, reviews = self.set_up(options['clients'], options['reviews'])
+        results = {'read': [], 'like': [], 'comment': []}
+        errors = {}
+
+        # Clients are processes, like the workers of an application server, so they really
+        # contend for the database; forked children must not share the parent's connection.
+        # Where there is no fork (Windows), clients are spawned and set Django up themselves
+        connections.close_all()
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        queue = context.Queue()
+        clients = [
+            context.Process(target=run_client, args=(user.pk, reviews, options['write_ratio'], options['duration'], queue))
+            for user in users
+        ]
+        started = time.monotonic()
+        for process in clients:
+            process.start()
+        for _ in clients:
+            latencies, client_errors = queue.get()
+            for kind, values in latencies.items():
+                results[kind].extend(values)
+            for message, count in client_errors.items():
+                errors[message] = errors.get(message, 0) + count
+        for process in clients:
+            process.join()
+        elapsed = time.monotonic() - started
+
+        settings_dict = connections['default'].settings_dict
+        self.stdout.write(f"{connections['default'].vendor} {settings_dict['NAME']} {settings_dict['OPTIONS'] or ''}")
+        self.stdout.write(f"{options['clients']} clients, {elapsed:.1f}s")
+        total = 0
+        for kind, latencies in results.items():
+            total += len(latencies)
+            if not latencies:
+                self.stdout.write(f'{kind:>8}: no successful operations')
+                continue
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+            self.stdout.write(
+                f'{kind:>8}: {len(latencies) / elapsed:8.0f} ops/s  '
+                f'p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms'
+            )
+        self.stdout.write(f'   total: {total / elapsed:8.0f} ops/s')
+        for message, count in errors.items():
+            self.stdout.write(self.style.WARNING(f'  errors: {count} x {message}'))
+
+        self.tear_down()
+
+    def set_up(self, clients, review_count):
+        self.tear_down()
+        users = [
+            User.objects.create_user(f'{BENCH_PREFIX}{n}@example.com', f'{BENCH_PREFIX}{n}', None)
+            for n in range(clients)
+        ]
+        reviews = Review.objects.bulk_create([
+            Review(user=users[n % clients], movie_title=f'{BENCH_PREFIX}movie {n % 5}', review_content='Benchmark', rating=3)
+            for n in range(review_count)
+        ])
+        return users, [review.pk for review in reviews]
+
+    def tear_down(self):
+        # Reviews, likes and comments go with their users
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
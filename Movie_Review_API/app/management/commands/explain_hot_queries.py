@@ -0,0 +1,55 @@
+# Standard library imports
+import statistics  # Median timings
+import time  # Timing each query
+
+# Django imports
+from django.core.management.base import BaseCommand  # Base class for management commands
+from django.utils import timezone  # "Due" time for the job query
+
+# Local app imports
+from app.models import Review, MovieStats, Job  # Models behind the hot endpoints
+from reviewcomment.models import ReviewComment  # Comment listing
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plan and median run time of the queries behind the busiest endpoints. '
+        'Run it before and after a migration to compare index usage.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20, help='Executions per query for the timing.')
+        parser.add_argument('--no-plans', action='store_true', help='Only print timings.')
+
+    def hot_queries(self):
+        # Use real values from the data so the plans reflect actual lookups
+        sample = Review.objects.order_by('-id').first()
+        title = sample.movie_title if sample else ''
+        review_id = sample.pk if sample else 0
+        user_id = sample.user_id if sample else 0
+        Like = Review.liked_by.through
+
+        return [
+            ('review list (newest first)', Review.objects.order_by('-created_at', '-id')[:5]),
+            ('review list ?movie_title=', Review.objects.filter(movie_title=title).order_by('-created_at')[:5]),
+            ('review list ?rating=', Review.objects.filter(rating=5).order_by('-created_at')[:5]),
+            ('review feed cursor by rating', Review.objects.filter(rating__lt=3).order_by('-rating', '-id')[:5]),
+            ('most liked reviews of a movie', Review.objects.filter(movie_title=title).order_by('-like_count', '-id')[:5]),
+            ('comments of a review', ReviewComment.objects.filter(review_id=review_id).order_by('-created_at', '-id')[:20]),
+            ('like exists', Like.objects.filter(review_id=review_id, user_id=user_id)),
+            ('home page leaderboard', MovieStats.objects.filter(review_count__gt=0).order_by('-review_count')),
+            ('due background jobs', Job.objects.filter(status=Job.PENDING, run_after__lte=timezone.now()).order_by('run_after')[:10]),
+        ]
+
+    def handle(self, *args, **options):
+        for name, queryset in self.hot_queries():
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                list(queryset.all())  # .all() clones, so each run hits the database
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {statistics.median(timings):.3f} ms median'))
+            if not options['no_plans']:
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f'    {line}')
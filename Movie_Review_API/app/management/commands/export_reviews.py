@@ -0,0 +1,46 @@
+# Standard library imports
+import sys  # Default output
+import time  # Export rate
+
+# Django imports
+from django.core.management.base import BaseCommand  # Base class for management commands
+
+# Local app imports
+from app.export import EXPORT_FORMATS, export_queryset, export_rows, export_lines  # Shared with the export endpoint
+
+
+class Command(BaseCommand):
+    help = (
+        'Write every review as NDJSON or CSV, streaming rows from the database in chunks '
+        'so memory use does not grow with the number of reviews.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson', dest='file_format')
+        parser.add_argument('--output', '-o', help='File to write (default: standard output).')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per database round trip.')
+        parser.add_argument('--movie-title', help='Only export reviews of this movie.')
+        parser.add_argument('--rating', type=int, help='Only export reviews with this rating.')
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(options['movie_title'], options['rating'])
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        started = time.monotonic()
+        lines = export_lines(options['file_format'], counted(export_rows(queryset, options['chunk_size'])))
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {count} review(s) in {elapsed:.1f}s ({count / elapsed if elapsed else count:.0f} rows/s).'
+        ))
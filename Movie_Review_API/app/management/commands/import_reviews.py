@@ -0,0 +1,244 @@
+# Standard library imports
+import csv  # CSV input and rejected rows
+import json  # NDJSON input and rejected rows
+import os  # Default rejected-rows path
+import sys  # Read from standard input
+import time  # Import rate
+from itertools import islice  # Read the input one batch at a time
+
+# Django imports
+from django.conf import settings  # Asynchronous enrichment setting
+from django.core.exceptions import ValidationError  # URL validation errors
+from django.core.management.base import BaseCommand, CommandError  # Base class for management commands
+from django.core.validators import URLValidator  # Poster URL check
+from django.db import transaction  # One transaction per batch
+from django.utils import timezone  # Aware timestamps
+from django.utils.dateparse import parse_datetime  # Imported created_at/updated_at
+
+# Local app imports
+from app.models import Review, Movie, User  # Imported rows and what they reference
+from app.omdb import normalize_title  # Movie lookup keys
+from app.tasks import enqueue_enrich_movies  # Fetch posters for new movies in the background
+
+
+MOVIE_TITLE_MAX_LENGTH = Review._meta.get_field('movie_title').max_length
+POSTER_URL_MAX_LENGTH = Review._meta.get_field('poster_url').max_length
+# Always strings in CSV; NDJSON rows can hold numbers, lists or objects instead
+TEXT_FIELDS = ('movie_title', 'review_content', 'email', 'username', 'poster_url', 'created_at', 'updated_at')
+
+
+def parse_rating(value):
+    """
+    An int, or a string of ASCII digits, as an int; None for anything else.
+    int() alone would truncate 4.7 to 4 and take JSON true/false as 1/0.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isascii() and value.isdigit():
+            return int(value)
+    return None
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        yield row, None
+
+
+def read_ndjson(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield {'line': line.rstrip('\n')}, f'line {number}: invalid JSON ({exc})'
+            continue
+        if not isinstance(row, dict):
+            yield {'line': line.rstrip('\n')}, f'line {number}: expected a JSON object'
+            continue
+        yield row, None
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class RejectedRows:
+    """
+    Writes rejected input rows, with the reason in an `error` column/key, in
+    the input's format so they can be fixed and imported again. The file is
+    only created once there is something to write.
+    """
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, row, error):
+        if self.file is None:
+            self.file = open(self.path, 'w', newline='', encoding='utf-8')
+        if self.file_format == 'csv':
+            if self.writer is None:
+                self.writer = csv.DictWriter(self.file, fieldnames=[*row, 'error'], extrasaction='ignore')
+                self.writer.writeheader()
+            self.writer.writerow({**row, 'error': error})
+        else:
+            self.file.write(json.dumps({**row, 'error': error}) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Import reviews from a CSV or NDJSON file (the format written by export_reviews). '
+        'Rows are validated in batches against in-memory user and movie maps and written with '
+        'bulk_create, one transaction per batch; invalid rows go to a rejected-rows file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for standard input.")
+        parser.add_argument('--format', choices=sorted(READERS), dest='file_format',
+                            help='Input format (default: from the file extension).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and written per transaction.')
+        parser.add_argument('--rejects', help='Where to write rejected rows (default: <input>.rejected.<format>).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing to the database.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError('Cannot tell the input format; pass --format csv or --format ndjson.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        rejects_path = options['rejects'] or (
+            f'{path}.rejected.{file_format}' if path != '-' else f'rejected.{file_format}'
+        )
+
+        # Every user once, so rows are matched without a query each
+        self.users_by_email = {}
+        self.users_by_username = {}
+        for user_id, email, username in User.objects.values_list('id', 'email', 'username').iterator():
+            self.users_by_email[email.lower()] = user_id
+            self.users_by_username[username] = user_id
+        self.movies = {}
+        self.url_validator = URLValidator()
+
+        rejected = RejectedRows(rejects_path, file_format)
+        imported = read = 0
+        started = time.monotonic()
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = READERS[file_format](stream)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                read += len(batch)
+                reviews = []
+                for row, error in batch:
+                    review, error = (None, error) if error else self.build_review(row)
+                    if error:
+                        rejected.write(row, error)
+                    else:
+                        reviews.append(review)
+                if reviews and not options['dry_run']:
+                    self.save(reviews)
+                imported += len(reviews)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{read} read, {imported} imported, {rejected.count} rejected '
+                    f'({read / elapsed if elapsed else read:.0f} rows/s)'
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            rejected.close()
+
+        action = 'validated' if options['dry_run'] else 'imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{imported} review(s) {action} in {time.monotonic() - started:.1f}s, {rejected.count} rejected.'
+        ))
+        if rejected.count:
+            self.stdout.write(f'Rejected rows written to {rejects_path}')
+
+    def build_review(self, row):
+        """
+        Check one row against the model's constraints using only in-memory data.
+        Returns (review, None) or (None, error).
+        """
+        for field in TEXT_FIELDS:
+            if row.get(field) is not None and not isinstance(row[field], str):
+                return None, f'{field} must be a string'
+        movie_title = ' '.join(str(row.get('movie_title') or '').split())
+        review_content = str(row.get('review_content') or '').strip()
+        if not movie_title:
+            return None, 'movie_title is required'
+        if len(movie_title) > MOVIE_TITLE_MAX_LENGTH:
+            return None, f'movie_title is longer than {MOVIE_TITLE_MAX_LENGTH} characters'
+        if not review_content:
+            return None, 'review_content is required'
+
+        rating = parse_rating(row.get('rating'))
+        if rating is None:
+            return None, 'rating must be a whole number'
+        if not 1 <= rating <= 5:
+            return None, 'rating must be between 1 and 5'
+
+        user_id = self.users_by_email.get(str(row.get('email') or '').lower()) or self.users_by_username.get(row.get('username'))
+        if user_id is None:
+            return None, 'no user with this email or username'
+
+        poster_url = row.get('poster_url') or None
+        if poster_url:
+            try:
+                if len(poster_url) > POSTER_URL_MAX_LENGTH:
+                    raise ValidationError('too long')
+                self.url_validator(poster_url)
+            except ValidationError:
+                return None, 'poster_url is not a valid URL'
+
+        now = timezone.now()
+        timestamps = {}
+        for field in ('created_at', 'updated_at'):
+            value = row.get(field)
+            if not value:
+                timestamps[field] = now
+                continue
+            try:
+                parsed = parse_datetime(value)
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                return None, f'{field} is not an ISO 8601 date and time'
+            timestamps[field] = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+        return Review(
+            movie_title=movie_title, review_content=review_content, rating=rating, user_id=user_id,
+            poster_url=poster_url, **timestamps,
+        ), None
+
+    def save(self, reviews):
+        # Movies not seen in earlier batches are created in one go; posters are fetched by the worker
+        new_titles = {normalize_title(review.movie_title): review.movie_title for review in reviews}
+        new_titles = [title for key, title in new_titles.items() if key not in self.movies]
+        new_movies = Movie.objects.resolve_titles(new_titles, fetch=False)
+        self.movies.update(new_movies)
+
+        for review in reviews:
+            review.movie = self.movies.get(normalize_title(review.movie_title))
+            if review.poster_url is None and review.movie is not None:
+                review.poster_url = review.movie.poster
+
+        with transaction.atomic():
+            Review.objects.bulk_create(reviews, keep_timestamps=True)
+
+        if settings.ENRICH_REVIEWS_ASYNC:
+            enqueue_enrich_movies([movie for movie in new_movies.values() if movie.needs_refresh()])
@@ -0,0 +1,13 @@
+# Django imports
+from django.core.management.base import BaseCommand  # Base class for management commands
+
+# Local app imports
+from app.models import MovieStats  # Precomputed movie leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the movie leaderboard stats (review count, rating sum/average, last reviewed) from all reviews.'
+
+    def handle(self, *args, **options):
+        movies = MovieStats.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {movies} movie(s).'))
@@ -0,0 +1,48 @@
+# Django imports
+from django.core.management.base import BaseCommand  # Base class for management commands
+from django.db.models import Count, F, OuterRef, Subquery  # Correlated counts per review
+from django.db.models.functions import Coalesce  # Reviews without likes/comments count as 0
+from django.utils import timezone  # Mark fixed reviews as modified
+
+# Local app imports
+from app.caching import invalidate, review_scope, REVIEWS  # Cached responses showing the old counts
+from app.models import Review  # Reviews carrying the denormalized counters
+from reviewcomment.models import ReviewComment  # Comments counted per review
+
+
+class Command(BaseCommand):
+    help = 'Recompute Review.like_count and Review.comment_count from the likes and comments tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report reviews whose counters drifted.')
+
+    def handle(self, *args, **options):
+        likes = (
+            Review.liked_by.through.objects.filter(review_id=OuterRef('pk'))
+            .values('review_id').annotate(n=Count('*')).values('n')
+        )
+        comments = (
+            ReviewComment.objects.filter(review_id=OuterRef('pk'))
+            .values('review_id').annotate(n=Count('*')).values('n')
+        )
+        drifted = Review.objects.annotate(
+            actual_likes=Coalesce(Subquery(likes), 0),
+            actual_comments=Coalesce(Subquery(comments), 0),
+        ).exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+
+        fixed = []
+        for review in drifted.only('id', 'like_count', 'comment_count').iterator():
+            self.stdout.write(
+                f'Review {review.pk}: likes {review.like_count} -> {review.actual_likes}, '
+                f'comments {review.comment_count} -> {review.actual_comments}'
+            )
+            if not options['dry_run']:
+                Review.objects.filter(pk=review.pk).update(
+                    like_count=review.actual_likes, comment_count=review.actual_comments, updated_at=timezone.now(),
+                )
+            fixed.append(review.pk)
+
+        if fixed and not options['dry_run']:
+            invalidate(REVIEWS, *(review_scope(pk) for pk in fixed))  # update() sends no signals
+        action = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{len(fixed)} review(s) {action}.'))
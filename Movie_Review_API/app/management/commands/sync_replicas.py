@@ -0,0 +1,45 @@
+# Standard library imports
+import sqlite3  # Online backup API
+import time  # Interval between copies
+
+# Django imports
+from django.conf import settings  # Replica aliases
+from django.core.management.base import BaseCommand, CommandError  # Base class for management commands
+from django.db import connections  # Database settings per alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database onto the SQLite replica files in DATABASE_REPLICAS, '
+        'standing in for replication when trying read replicas locally. Run it again (or with '
+        '--every) to let the replicas catch up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, help='Keep copying every N seconds, simulating replication lag.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS.')
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas can be synced here; use the database\'s own replication.')
+
+        while True:
+            self.sync()
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def sync(self):
+        source = sqlite3.connect(connections['default'].settings_dict['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    # A consistent snapshot, even while the primary is being written to
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias} synced.')
+        finally:
+            source.close()
@@ -0,0 +1,49 @@
+# Standard library imports
+import signal  # Stop cleanly on SIGTERM/SIGINT
+import threading  # Worker pool threads
+
+# Django imports
+from django.conf import settings  # Default pool size
+from django.core.management.base import BaseCommand  # Base class for management commands
+from django.db import connections  # Per-thread database connections
+
+# Local app imports
+from app import jobs  # Job queue runner
+
+
+class Command(BaseCommand):
+    help = 'Process queued background jobs (poster/metadata enrichment, ...) with a pool of worker threads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=settings.JOBS_WORKER_THREADS, help='Number of worker threads.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained.')
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping after the current jobs...')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def work():
+            try:
+                jobs.work(stop_event, options['poll_interval'], options['once'])
+            finally:
+                connections.close_all()  # Close this thread's connections
+
+        threads = [
+            threading.Thread(target=work, name=f'job-worker-{number}')
+            for number in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Worker started with {len(threads)} thread(s).")
+        for thread in threads:
+            # join() with a timeout keeps the main thread responsive to signals
+            while thread.is_alive():
+                thread.join(timeout=1)
+        self.stdout.write(self.style.SUCCESS('Worker stopped.'))
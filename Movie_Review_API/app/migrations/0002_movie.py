@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('lookup_key', models.CharField(max_length=255, unique=True)),
+                ('year', models.CharField(blank=True, max_length=20)),
+                ('imdb_id', models.CharField(blank=True, max_length=20)),
+                ('poster', models.URLField(blank=True, max_length=500, null=True)),
+                ('plot', models.TextField(blank=True)),
+                ('details', models.JSONField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='movie',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviews', to='app.movie'),
+        ),
+    ]
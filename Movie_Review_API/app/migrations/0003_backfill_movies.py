@@ -0,0 +1,41 @@
+# Backfill Movie rows from the titles and posters already stored on reviews
+
+from django.db import migrations
+
+
+def normalize_title(movie_title):
+    # Frozen copy of app.omdb.normalize_title
+    return ' '.join((movie_title or '').split()).casefold()
+
+
+def backfill_movies(apps, schema_editor):
+    Movie = apps.get_model('app', 'Movie')
+    Review = apps.get_model('app', 'Review')
+
+    movies = {}
+    for review in Review.objects.filter(movie__isnull=True).only('id', 'movie_title', 'poster_url').iterator():
+        key = normalize_title(review.movie_title)
+        if not key:
+            continue
+        movie = movies.get(key)
+        if movie is None:
+            movie, created = Movie.objects.get_or_create(
+                lookup_key=key,
+                defaults={'title': ' '.join(review.movie_title.split())},
+            )
+            movies[key] = movie
+        if review.poster_url and not movie.poster:
+            movie.poster = review.poster_url
+            movie.save(update_fields=['poster'])
+        Review.objects.filter(pk=review.pk).update(movie=movie)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_movie'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_movies, migrations.RunPython.noop),
+    ]
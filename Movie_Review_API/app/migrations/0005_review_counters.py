@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing(apps, schema_editor):
+    Review = apps.get_model('app', 'Review')
+    ReviewComment = apps.get_model('reviewcomment', 'ReviewComment')
+    Like = Review.liked_by.through
+
+    likes = Like.objects.filter(review_id=OuterRef('pk')).values('review_id').annotate(n=Count('*')).values('n')
+    comments = ReviewComment.objects.filter(review_id=OuterRef('pk')).values('review_id').annotate(n=Count('*')).values('n')
+    Review.objects.update(
+        like_count=Coalesce(Subquery(likes), 0),
+        comment_count=Coalesce(Subquery(comments), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_job'),
+        ('reviewcomment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['movie_title', '-like_count'], name='review_title_likes_idx'),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def build_stats(apps, schema_editor):
+    Review = apps.get_model('app', 'Review')
+    MovieStats = apps.get_model('app', 'MovieStats')
+    rows = (
+        Review.objects.filter(movie__isnull=False).values('movie_id')
+        .annotate(count=Count('id'), total=Sum('rating'), latest=Max('created_at'))
+    )
+    MovieStats.objects.bulk_create([
+        MovieStats(
+            movie_id=row['movie_id'],
+            review_count=row['count'],
+            rating_sum=row['total'],
+            average_rating=row['total'] / row['count'],
+            last_reviewed_at=row['latest'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_review_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieStats',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='app.movie')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-review_count'], name='moviestats_count_idx')],
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
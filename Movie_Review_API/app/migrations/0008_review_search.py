@@ -0,0 +1,46 @@
+# Full-text search index for reviews: an FTS5 table on SQLite, a GIN expression index on PostgreSQL
+
+from django.db import migrations, OperationalError
+
+
+PG_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(movie_title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(review_content, '')), 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS app_review_fts "
+                "USING fts5(movie_title, review_content, tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return  # SQLite built without FTS5: search falls back to LIKE
+        schema_editor.execute(
+            "INSERT INTO app_review_fts(rowid, movie_title, review_content) "
+            "SELECT id, movie_title, review_content FROM app_review"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS review_search_idx ON app_review USING GIN (({PG_VECTOR_SQL}))")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS app_review_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS review_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_movie_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_review_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('app.user',),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_tokenuser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='rerun',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_job_rerun'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_title_likes_idx',
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['movie_title', '-like_count', '-id'], name='review_title_likes_id_idx'),
+        ),
+    ]
@@ -1,11 +1,71 @@
 # Django imports for models and validation
-from django.db import models  # Base class for defining Django models (database tables)
+from django.db import models, transaction, IntegrityError  # Base class for defining Django models (database tables)
+from django.db.models import F, Value, Count, Sum, Max, FloatField  # Atomic counter updates and aggregates
+from django.db.models.fields.files import FieldFile  # Files compare by stored name
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf  # Incremental average/last-reviewed updates
+from django.dispatch import Signal  # Hook for bulk-created reviews
 from django.core.exceptions import ValidationError  # Used to raise validation errors in custom model methods
 from django.core.validators import MinValueValidator, MaxValueValidator  # Built-in validators for limiting field values
+from django.utils import timezone  # Timestamps for movie metadata refreshes
+from django.conf import settings  # OMDb refresh settings
 
 # Django auth imports for custom user models
 from django.contrib.auth.models import AbstractUser, BaseUserManager  # AbstractUser for extending User model, BaseUserManager for custom user manager
 
+# Cached OMDb lookups
+from .omdb import fetch_movie_details, afetch_movie_details, fetch_many_movie_details, normalize_title, MOVIE_NOT_FOUND, CONNECTION_FAILED
+
+
+class TrackedFieldsMixin:
+    """
+    Remember the `tracked_fields` (attribute names) of a model instance as
+    loaded or last saved, so changed_fields() can tell what a save changes
+    and saved_value() what it replaces. Receivers of post_save still see the
+    values from before the save. Instances not loaded from the database
+    report every tracked field as changed.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_tracked_values(kwargs.get('update_fields'))
+
+    def _tracked_value(self, field):
+        value = self.__dict__.get(field)
+        return value.name if isinstance(value, FieldFile) else value
+
+    def remember_tracked_values(self, update_fields=None):
+        saved = getattr(self, '_tracked_values', None)
+        if saved is None or update_fields is None:
+            self._tracked_values = {field: self._tracked_value(field) for field in self.tracked_fields}
+            return
+        # A partial save only wrote these
+        written = {self._meta.get_field(name).attname for name in update_fields}
+        for field in self.tracked_fields:
+            if field in written:
+                saved[field] = self._tracked_value(field)
+
+    def changed_fields(self):
+        saved = getattr(self, '_tracked_values', None)
+        if saved is None:
+            return list(self.tracked_fields)
+        return [field for field in self.tracked_fields if saved[field] != self._tracked_value(field)]
+
+    def saved_value(self, field, default=None):
+        """
+        The value of a tracked field as loaded or last saved, or `default`
+        for an instance that was not loaded from the database.
+        """
+        saved = getattr(self, '_tracked_values', None)
+        return default if saved is None else saved[field]
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, username, password=None, **extra_fields):
@@ -33,7 +93,7 @@ class UserManager(BaseUserManager):
         return self.create_user(email, username, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(TrackedFieldsMixin, AbstractUser):
     email = models.EmailField(unique=True, max_length=255)
     username = models.CharField(unique=True, max_length=255)  # Set unique=True
     objects = UserManager()
@@ -41,35 +101,275 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']  # Require username for creation
 
+    # Copied into access tokens, so in token-user mode changing one revokes the user's tokens
+    # (see TokenUser). Tokens are only signed, not encrypted: keep personal data such as the email out.
+    TOKEN_CLAIM_FIELDS = ('username', 'is_staff', 'is_superuser')
+    REVOKING_FIELDS = ('is_active', 'password')  # Changing these always revokes the user's tokens
+    # Changes to any of these make other processes reload their cached copy of the user
+    tracked_fields = (*TOKEN_CLAIM_FIELDS, 'email', *REVOKING_FIELDS)
+
     def __str__(self):
         return self.username
 
 
+class TokenUser(User):
+    """
+    A User rebuilt from access token claims without touching the database
+    (JWT_TOKEN_USERS). It compares equal to, and can be assigned wherever,
+    the real User goes, but is read-only: load the User to change it.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, claims):
+        user = cls(id=user_id, is_active=True, **{field: claims[field] for field in User.TOKEN_CLAIM_FIELDS})
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
+
+    def save(self, *args, **kwargs):
+        raise TypeError('TokenUser is built from a token and cannot be saved; load the User instead.')
+
+    def delete(self, *args, **kwargs):
+        raise TypeError('TokenUser is built from a token and cannot be deleted; load the User instead.')
+
+
+class MovieManager(models.Manager):
+    def for_title(self, movie_title):
+        """
+        Return the movie matching a review title, creating it on first use.
+        """
+        movie, created = self.get_or_create(
+            lookup_key=normalize_title(movie_title),
+            defaults={'title': ' '.join(movie_title.split())},
+        )
+        return movie
+
+    def resolve_titles(self, movie_titles, fetch=True):
+        """
+        Return {lookup_key: movie} for many titles at once. Movies are loaded and
+        created in bulk, and with `fetch` missing OMDb details are fetched concurrently.
+        """
+        titles = {}
+        for movie_title in movie_titles:
+            key = normalize_title(movie_title)
+            if key and key not in titles:
+                titles[key] = ' '.join(movie_title.split())
+        if not titles:
+            return {}
+
+        self.bulk_create(
+            [self.model(lookup_key=key, title=title) for key, title in titles.items()],
+            ignore_conflicts=True,  # Movies that already exist are kept as they are
+        )
+        movies = {movie.lookup_key: movie for movie in self.filter(lookup_key__in=titles)}
+        if not fetch:
+            return movies
+
+        stale = [movie for movie in movies.values() if movie.needs_refresh()]
+        fetched = fetch_many_movie_details(movie.title for movie in stale)
+        for movie in stale:
+            if movie.apply_details(fetched[movie.lookup_key]):
+                movie.save(update_fields=['details', 'fetched_at', 'year', 'imdb_id', 'plot', 'poster'])
+        return movies
+
+
+class Movie(models.Model):
+    title = models.CharField(max_length=255)
+    lookup_key = models.CharField(max_length=255, unique=True)  # Normalized title used for lookups
+    year = models.CharField(max_length=20, blank=True)  # OMDb years can be ranges, e.g. "2005–2008"
+    imdb_id = models.CharField(max_length=20, blank=True)
+    poster = models.URLField(max_length=500, null=True, blank=True)
+    plot = models.TextField(blank=True)
+    details = models.JSONField(null=True, blank=True)  # Raw OMDb payload served by the review detail view
+    fetched_at = models.DateTimeField(null=True, blank=True)  # When the details were last fetched from OMDb
+
+    objects = MovieManager()
+
+    def needs_refresh(self):
+        if self.fetched_at is None:
+            return True
+        # "Movie not found" answers are retried once the negative cache TTL has passed
+        if self.details == MOVIE_NOT_FOUND:
+            age = timezone.now() - self.fetched_at
+            return age.total_seconds() > settings.OMDB_NEGATIVE_CACHE_TTL
+        return False
+
+    def apply_details(self, data):
+        """
+        Copy an OMDb payload onto the movie. Returns False for connection failures,
+        which leave the movie untouched so the next read retries.
+        """
+        if data == CONNECTION_FAILED:
+            return False
+        self.details = data
+        self.fetched_at = timezone.now()
+        if data != MOVIE_NOT_FOUND:
+            self.year = data.get('Year', '')[:20]
+            self.imdb_id = data.get('imdbID', '')[:20]
+            self.plot = data.get('Plot', '')
+            poster = data.get('Poster')
+            if poster and poster != 'N/A':
+                self.poster = poster
+        return True
+
+    def get_details(self):
+        """
+        Return the OMDb details for this movie, fetching and storing them only when missing or stale.
+        """
+        if not self.needs_refresh():
+            return self.details
+        data = fetch_movie_details(self.title)
+        if self.apply_details(data):
+            self.save(update_fields=['details', 'fetched_at', 'year', 'imdb_id', 'plot', 'poster'])
+        elif self.details is not None:
+            return self.details  # OMDb is unreachable: keep serving what we already have
+        return data
+
+    async def aget_details(self):
+        """
+        get_details() for the async views: OMDb is awaited instead of blocking a thread.
+        """
+        if not self.needs_refresh():
+            return self.details
+        data = await afetch_movie_details(self.title)
+        if self.apply_details(data):
+            await self.asave(update_fields=['details', 'fetched_at', 'year', 'imdb_id', 'plot', 'poster'])
+        elif self.details is not None:
+            return self.details
+        return data
+
+    def __str__(self):
+        return self.title
+
+
+# Sent after ReviewManager.bulk_create with `reviews`, since bulk_create skips post_save
+reviews_bulk_created = Signal()
 
+# Sent by ReviewManager.add_like/remove_like with `review_id`; their direct writes
+# to the likes table send neither post_save/post_delete nor m2m_changed
+review_likes_changed = Signal()
 
-class Review(models.Model):
+
+class ReviewManager(models.Manager):
+    def bulk_create(self, objs, *args, keep_timestamps=False, **kwargs):
+        """
+        bulk_create() that announces the new reviews (reviews_bulk_created).
+        With keep_timestamps=True, the created_at/updated_at values set on the
+        objects (e.g. imported history) are written back over the insert time.
+        """
+        objs = list(objs)
+        timestamps = [(obj.created_at, obj.updated_at) for obj in objs] if keep_timestamps else None
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if keep_timestamps:
+            # auto_now/auto_now_add stamp every inserted row; bulk_update() leaves values as they are
+            for obj, (created_at, updated_at) in zip(objs, timestamps):
+                obj.created_at, obj.updated_at = created_at, updated_at
+            self.bulk_update(objs, ['created_at', 'updated_at'])
+        reviews_bulk_created.send(sender=self.model, reviews=objs)
+        return objs
+
+    def add_like(self, review_id, user_id):
+        """
+        Record that a user likes a review with a single insert on the likes table,
+        relying on its unique (review, user) constraint instead of loading the likers.
+        Returns (created, like_count); like_count is None if the review does not exist.
+        """
+        Like = self.model.liked_by.through
+        with transaction.atomic():
+            if not self.filter(pk=review_id).update(like_count=F('like_count') + 1, updated_at=timezone.now()):
+                return False, None
+            try:
+                with transaction.atomic():
+                    Like.objects.create(review_id=review_id, user_id=user_id)
+                created = True
+            except IntegrityError:
+                created = False
+                transaction.set_rollback(True)  # Already liked: undo the counter bump
+        if created:
+            review_likes_changed.send(sender=self.model, review_id=review_id, using=self.db)
+        return created, self.like_count(review_id)
+
+    def remove_like(self, review_id, user_id):
+        """
+        Remove a user's like with a single delete on the likes table.
+        Returns (removed, like_count); like_count is None if the review does not exist.
+        """
+        Like = self.model.liked_by.through
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(review_id=review_id, user_id=user_id).delete()
+            if deleted:
+                self.filter(pk=review_id).update(like_count=F('like_count') - deleted, updated_at=timezone.now())
+        if deleted:
+            review_likes_changed.send(sender=self.model, review_id=review_id, using=self.db)
+        return bool(deleted), self.like_count(review_id)
+
+    def like_count(self, review_id):
+        return self.filter(pk=review_id).values_list('like_count', flat=True).first()
+
+
+class Review(TrackedFieldsMixin, models.Model):
+    movie = models.ForeignKey(Movie, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviews')
     movie_title = models.CharField(max_length=255)
     review_content = models.TextField()
     rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     user = models.ForeignKey(User, on_delete=models.CASCADE ,related_name='reviews')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Also bumped by the counter updates; drives ETag/Last-Modified
     poster_url = models.URLField(max_length=500, null=True, blank=True)  # Add this field for the image URL
 
     # Track likes with a Many-to-Many relationship
     liked_by = models.ManyToManyField(User, related_name='liked_reviews', blank=True)
 
+    # Denormalized counters, kept in step by the like/unlike views and the comment signals
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ReviewManager()
+
+    COUNTER_FIELDS = ('like_count', 'comment_count')  # Only ever written with F() updates
+    tracked_fields = ('movie_id', 'rating')  # What the movie stats currently count for this review
+
+    class Meta:
+        indexes = [
+            # Most liked reviews of a movie, with the id breaking ties so pages are stable
+            models.Index(fields=['movie_title', '-like_count', '-id'], name='review_title_likes_id_idx'),
+            # Keyset pagination of the review feed
+            models.Index(fields=['created_at', 'id'], name='review_created_id_idx'),
+            models.Index(fields=['rating', 'id'], name='review_rating_id_idx'),
+            # Review feed filtered by ?movie_title= or ?rating=, newest first
+            models.Index(fields=['movie_title', '-created_at'], name='review_title_created_idx'),
+            models.Index(fields=['rating', '-created_at'], name='review_rating_created_idx'),
+        ]
+
     def clean(self):
         if not self.movie_title:
             raise ValidationError('Movie Title is required.')
         if not self.review_content:
             raise ValidationError('Review Content is required.')
 
-    def save(self, *args, **kwargs):
-        self.full_clean()  # Validate before saving
+    def save(self, *args, validated=False, **kwargs):
+        # Validate before saving, unless the caller (a serializer or admin form) already has;
+        # full_clean() would repeat those checks and look up the user and movie rows again
+        if not validated:
+            self.full_clean()
+        # Keep the movie reference in step with the title
+        if self.movie is None or self.movie.lookup_key != normalize_title(self.movie_title):
+            self.movie = Movie.objects.for_title(self.movie_title)
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # The counters may have moved since this instance was loaded; writing
+            # them back would undo concurrent likes and comments
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS and field.attname not in deferred
+            ]
         super().save(*args, **kwargs)
 
     def total_likes(self):
-        return self.liked_by.count()
+        return self.like_count
 
 
 
@@ -77,3 +377,175 @@ class Review(models.Model):
         return f"{self.movie_title} - {self.user.username}"
 
 
+class MovieStatsManager(models.Manager):
+    def apply_delta(self, movie_id, review_count, rating_sum, reviewed_at=None):
+        """
+        Add `review_count` reviews totalling `rating_sum` to a movie's stats
+        (negative values remove them) with a single UPDATE.
+        """
+        if movie_id is None:
+            return
+        self.get_or_create(movie_id=movie_id)
+        changes = {
+            'review_count': F('review_count') + review_count,
+            'rating_sum': F('rating_sum') + rating_sum,
+            # Right-hand sides see the old values, so the average is computed from them
+            'average_rating': Cast(F('rating_sum') + rating_sum, FloatField()) / NullIf(F('review_count') + review_count, 0),
+        }
+        if reviewed_at is not None:
+            changes['last_reviewed_at'] = Greatest(Coalesce(F('last_reviewed_at'), Value(reviewed_at)), Value(reviewed_at))
+        self.filter(movie_id=movie_id).update(**changes)
+
+    def apply_deltas(self, deltas):
+        """
+        apply_delta() for many movies at once: {movie_id: (review_count, rating_sum, reviewed_at)}.
+        Rows are locked, updated in Python and written back with one upsert,
+        so a large batch costs a handful of queries instead of two per movie.
+        """
+        if not deltas:
+            return
+        with transaction.atomic():
+            self.bulk_create([self.model(movie_id=movie_id) for movie_id in deltas], ignore_conflicts=True)
+            stats = list(self.select_for_update().filter(movie_id__in=deltas))
+            for row in stats:
+                review_count, rating_sum, reviewed_at = deltas[row.movie_id]
+                row.review_count += review_count
+                row.rating_sum += rating_sum
+                row.average_rating = row.rating_sum / row.review_count if row.review_count else None
+                if reviewed_at is not None:
+                    row.last_reviewed_at = max(row.last_reviewed_at or reviewed_at, reviewed_at)
+            # Rows exist and are locked, so the upsert only overwrites them (bulk_update's CASE is far slower)
+            self.bulk_create(
+                stats, batch_size=500, update_conflicts=True, unique_fields=['movie'],
+                update_fields=['review_count', 'rating_sum', 'average_rating', 'last_reviewed_at'],
+            )
+
+    def refresh_last_reviewed(self, movie_id):
+        # After a delete the latest review may be gone; look it up again
+        latest = Review.objects.filter(movie_id=movie_id).aggregate(latest=Max('created_at'))['latest']
+        self.filter(movie_id=movie_id).update(last_reviewed_at=latest)
+
+    def rebuild(self):
+        """
+        Recompute every movie's stats from the reviews table.
+        """
+        rows = (
+            Review.objects.filter(movie__isnull=False).values('movie_id')
+            .annotate(count=Count('id'), total=Sum('rating'), latest=Max('created_at'))
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create([
+                self.model(
+                    movie_id=row['movie_id'],
+                    review_count=row['count'],
+                    rating_sum=row['total'],
+                    average_rating=row['total'] / row['count'],
+                    last_reviewed_at=row['latest'],
+                )
+                for row in rows
+            ], batch_size=1000)
+        return self.count()
+
+
+class MovieStats(models.Model):
+    """
+    Precomputed per-movie review stats behind the home page leaderboard,
+    kept up to date by the signal handlers in app.signals.
+    """
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = MovieStatsManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-review_count'], name='moviestats_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.movie} - {self.review_count} reviews"
+
+
+class JobManager(models.Manager):
+    def enqueue(self, kind, key, payload=None, max_attempts=5):
+        """
+        Queue a background job. Enqueueing is idempotent: while a job with the
+        same kind and key is pending, that job is returned instead. A running
+        one may already be past the data this request is about, so it is
+        flagged to run once more when it finishes.
+        """
+        key = str(key)
+        while True:
+            try:
+                with transaction.atomic():
+                    return self.create(kind=kind, key=key, payload=payload or {}, max_attempts=max_attempts)
+            except IntegrityError:
+                pass
+            live = self.filter(kind=kind, key=key, status__in=[Job.PENDING, Job.RUNNING]).first()
+            if live is None:
+                continue  # Finished in the meantime: queue a new one
+            if live.status == Job.RUNNING and not self.filter(pk=live.pk, status=Job.RUNNING).update(rerun=True):
+                continue
+            return live
+
+    def enqueue_many(self, kind, payloads, max_attempts=5):
+        """
+        Queue jobs for {key: payload} in one INSERT, skipping keys that already
+        have a live job (running ones are flagged to run again, see enqueue()).
+        Returns the number of keys passed.
+        """
+        jobs = {str(key): payload for key, payload in payloads.items()}
+        while jobs:
+            self.bulk_create(
+                [self.model(kind=kind, key=key, payload=payload or {}, max_attempts=max_attempts)
+                 for key, payload in jobs.items()],
+                ignore_conflicts=True,  # unique_live_job: a pending or running job already covers this key
+            )
+            self.filter(kind=kind, key__in=jobs, status=Job.RUNNING).update(rerun=True)
+            # Keys whose job finished between the two statements need a job of their own
+            live = set(self.filter(kind=kind, key__in=jobs, status__in=[Job.PENDING, Job.RUNNING]).values_list('key', flat=True))
+            jobs = {key: payload for key, payload in jobs.items() if key not in live}
+        return len(payloads)
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=50)  # Name of the registered handler
+    key = models.CharField(max_length=255)  # Identifies the work, e.g. a movie id
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)  # Not picked up before this time (retry backoff)
+    locked_at = models.DateTimeField(null=True, blank=True)  # When a worker claimed the job
+    last_error = models.TextField(blank=True)
+    rerun = models.BooleanField(default=False)  # Enqueued again while running: run once more when done
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = JobManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+        constraints = [
+            # At most one live job per piece of work
+            models.UniqueConstraint(
+                fields=['kind', 'key'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_live_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.key} ({self.status})"
@@ -0,0 +1,462 @@
+# Standard library imports
+import asyncio  # Backoff and per-event-loop clients for the async views
+import hashlib  # Hash titles into backend-safe shared cache keys
+import threading  # Lock guarding the in-process cache and counters
+import time  # Monotonic clock for local cache expiry
+import weakref  # One async client per event loop, dropped with the loop
+from collections import OrderedDict  # Keeps insertion order for LRU eviction
+from concurrent.futures import ThreadPoolExecutor, wait  # Bounded pool for concurrent lookups
+
+# Django imports
+from django.conf import settings  # Access OMDb and cache settings
+from django.core.cache import caches  # Shared cache tier (file/database/redis backend)
+
+# Third-party imports
+from asgiref.sync import sync_to_async  # Blocking client in a worker thread when httpx is missing
+import requests  # Allows making HTTP requests to interact with external APIs
+from requests.adapters import HTTPAdapter  # Connection pool sizing for the OMDb session
+
+try:
+    import httpx  # Optional: non-blocking OMDb requests for the async views
+except ImportError:
+    httpx = None
+
+
+MOVIE_NOT_FOUND = {'error': 'Movie not found'}
+CONNECTION_FAILED = {'error': 'Failed to connect to OMDb'}
+
+
+def normalize_title(movie_title):
+    """
+    Build the cache key for a movie title: case-folded with whitespace collapsed,
+    so "The  Matrix" and "the matrix" share one entry.
+    """
+    return ' '.join((movie_title or '').split()).casefold()
+
+
+class LocalTTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after their own TTL.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Return (found, value); expired entries are dropped on read
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)  # Evict the least recently used entry
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class MovieDetailsCache:
+    """
+    Two-tier cache for OMDb payloads: a per-process LRU in front of the shared
+    cache configured by OMDB_CACHE_ALIAS. "Movie not found" answers are cached
+    too, with the shorter OMDB_NEGATIVE_CACHE_TTL.
+    """
+
+    key_prefix = 'omdb:movie:'
+
+    def __init__(self):
+        self.local = LocalTTLCache(settings.OMDB_LOCAL_CACHE_SIZE)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def shared(self):
+        return caches[settings.OMDB_CACHE_ALIAS]
+
+    def shared_key(self, key):
+        # Titles contain spaces and punctuation that some cache backends reject
+        return self.key_prefix + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def get(self, key):
+        found, value = self.local.get(key)
+        if found:
+            self._count('local_hits')
+            return True, value
+
+        value = self.shared.get(self.shared_key(key))
+        if value is not None:
+            self._count('shared_hits')
+            # Promote into the local tier; the shared entry carries its own expiry
+            self.local.set(key, value, self.ttl_for(value))
+            return True, value
+
+        self._count('misses')
+        return False, None
+
+    async def aget(self, key):
+        # Same as get(), without blocking the event loop on the shared tier
+        found, value = self.local.get(key)
+        if found:
+            self._count('local_hits')
+            return True, value
+
+        value = await self.shared.aget(self.shared_key(key))
+        if value is not None:
+            self._count('shared_hits')
+            self.local.set(key, value, self.ttl_for(value))
+            return True, value
+
+        self._count('misses')
+        return False, None
+
+    def set(self, key, value):
+        ttl = self.ttl_for(value)
+        self.local.set(key, value, ttl)
+        self.shared.set(self.shared_key(key), value, ttl)
+
+    async def aset(self, key, value):
+        ttl = self.ttl_for(value)
+        self.local.set(key, value, ttl)
+        await self.shared.aset(self.shared_key(key), value, ttl)
+
+    def ttl_for(self, value):
+        if value == MOVIE_NOT_FOUND:
+            return settings.OMDB_NEGATIVE_CACHE_TTL
+        return settings.OMDB_CACHE_TTL
+
+    def reset_stats(self):
+        with self._lock:
+            self.counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+
+movie_cache = MovieDetailsCache()
+
+
+class CircuitBreaker:
+    """
+    Stops calling OMDb after `failure_threshold` consecutive failures. Once
+    `reset_timeout` seconds have passed a single trial call is let through:
+    success closes the breaker again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True  # Half-open: let one caller probe the upstream
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class OMDbClient:
+    """
+    HTTP client for OMDb with a pooled keep-alive session, connect/read
+    timeouts, bounded retries with exponential backoff and a circuit breaker.
+    Any keyword left out is read from the OMDB_* settings.
+    """
+
+    def __init__(self, base_url=None, api_key=None, connect_timeout=None, read_timeout=None,
+                 retries=None, backoff=None, failure_threshold=None, reset_timeout=None, pool_size=None):
+        self.base_url = base_url or settings.OMDB_URL
+        self.api_key = api_key or settings.OMDB_API_KEY
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else settings.OMDB_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else settings.OMDB_READ_TIMEOUT,
+        )
+        self.retries = retries if retries is not None else settings.OMDB_RETRIES
+        self.backoff = backoff if backoff is not None else settings.OMDB_RETRY_BACKOFF
+        self.breaker = CircuitBreaker(
+            failure_threshold or settings.OMDB_BREAKER_THRESHOLD,
+            reset_timeout if reset_timeout is not None else settings.OMDB_BREAKER_RESET_TIMEOUT,
+        )
+
+        pool_size = pool_size or settings.OMDB_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_movie(self, movie_title):
+        """
+        Ask OMDb for a movie title, without consulting the cache.
+        Returns the payload, MOVIE_NOT_FOUND or CONNECTION_FAILED.
+        """
+        if not self.breaker.allow_request():
+            return CONNECTION_FAILED  # Upstream is failing: answer at once instead of waiting
+        try:
+            return self._get_movie(movie_title)
+        except BaseException:
+            # Anything else going wrong still ends a half-open trial, or the breaker never closes
+            self.breaker.record_failure()
+            raise
+
+    def _get_movie(self, movie_title):
+        params = {'t': movie_title, 'apikey': self.api_key}
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except requests.RequestException:
+                continue  # Connection errors and timeouts are retried
+            if response.status_code >= 500:
+                continue  # So are upstream server errors
+
+            return self.handle_response(response.status_code, response.json)
+
+        self.breaker.record_failure()
+        return CONNECTION_FAILED
+
+    def handle_response(self, status_code, json):
+        """
+        Parse an answer that was not a server error, and tell the breaker
+        whether OMDb is working: a body that is not an OMDb payload is a failure.
+        """
+        result = self.parse_response(status_code, json)
+        if result is CONNECTION_FAILED:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return result
+
+    @staticmethod
+    def parse_response(status_code, json):
+        if status_code != 200:
+            return MOVIE_NOT_FOUND
+        try:
+            data = json()
+        except ValueError:
+            return CONNECTION_FAILED
+        if not isinstance(data, dict):
+            return CONNECTION_FAILED  # Valid JSON, but an array or a scalar
+        # OMDb answers unknown titles with 200 and {"Response": "False"}
+        if data.get('Response') == 'False':
+            return MOVIE_NOT_FOUND
+        return data
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOMDbClient:
+    """
+    asyncio counterpart of OMDbClient for the async views, sharing its
+    settings, response handling and circuit breaker. Requests go through
+    httpx when it is installed; otherwise the blocking client runs in a
+    worker thread, which still keeps the event loop free.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.session = None
+        if httpx is not None:
+            connect_timeout, read_timeout = client.timeout
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=settings.OMDB_POOL_SIZE),
+            )
+
+    async def get_movie(self, movie_title):
+        client = self.client
+        if self.session is None:
+            return await sync_to_async(client.get_movie, thread_sensitive=False)(movie_title)
+        if not client.breaker.allow_request():
+            return CONNECTION_FAILED
+        try:
+            return await self._get_movie(movie_title)
+        except BaseException:  # Cancellation included
+            client.breaker.record_failure()
+            raise
+
+    async def _get_movie(self, movie_title):
+        client = self.client
+        params = {'t': movie_title, 'apikey': client.api_key}
+        for attempt in range(client.retries + 1):
+            if attempt:
+                await asyncio.sleep(client.backoff * 2 ** (attempt - 1))
+            try:
+                response = await self.session.get(client.base_url, params=params)
+            except httpx.HTTPError:
+                continue
+            if response.status_code >= 500:
+                continue
+
+            return client.handle_response(response.status_code, response.json)
+
+        client.breaker.record_failure()
+        return CONNECTION_FAILED
+
+    async def aclose(self):
+        if self.session is not None:
+            await self.session.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide OMDb client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OMDbClient()
+    return _client
+
+
+def set_client(client):
+    """
+    Replace the process-wide OMDb client (used by tests to point at a stub server).
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+_async_clients = weakref.WeakKeyDictionary()
+_closing = set()  # aclose() tasks of replaced clients, kept alive until they finish
+
+
+def get_async_client():
+    """
+    Return the async OMDb client of the running event loop; httpx clients
+    cannot be shared between loops. A client left behind by set_client() is
+    closed in the background so its connections are not leaked.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.client is not get_client():
+        if client is not None:
+            task = loop.create_task(client.aclose())
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+        client = _async_clients[loop] = AsyncOMDbClient(get_client())
+    return client
+
+
+def fetch_movie_details(movie_title):
+    """
+    Return the OMDb details for a movie title, served from the cache when possible.
+    """
+    key = normalize_title(movie_title)
+    if not key:
+        return MOVIE_NOT_FOUND
+
+    found, data = movie_cache.get(key)
+    if found:
+        return data
+
+    data = get_client().get_movie(movie_title)
+    # Connection failures are transient, so only real answers are cached
+    if data is not CONNECTION_FAILED:
+        movie_cache.set(key, data)
+    return data
+
+
+async def afetch_movie_details(movie_title):
+    """
+    fetch_movie_details() for the async views: same cache, non-blocking lookup.
+    """
+    key = normalize_title(movie_title)
+    if not key:
+        return MOVIE_NOT_FOUND
+
+    found, data = await movie_cache.aget(key)
+    if found:
+        return data
+
+    data = await get_async_client().get_movie(movie_title)
+    if data is not CONNECTION_FAILED:
+        await movie_cache.aset(key, data)
+    return data
+
+
+def fetch_many_movie_details(movie_titles, max_workers=None, deadline=None):
+    """
+    Fetch details for many titles concurrently through a bounded thread pool.
+
+    Titles are deduplicated by normalized key and the result maps each key to
+    its payload. Lookups still running when the deadline (in seconds) passes
+    are reported as CONNECTION_FAILED instead of being waited for.
+    """
+    titles = {}
+    for movie_title in movie_titles:
+        key = normalize_title(movie_title)
+        if key and key not in titles:
+            titles[key] = movie_title
+    if not titles:
+        return {}
+
+    max_workers = min(max_workers or settings.OMDB_MAX_WORKERS, len(titles))
+    deadline = settings.OMDB_BULK_DEADLINE if deadline is None else deadline
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='omdb')
+    try:
+        futures = {key: executor.submit(fetch_movie_details, title) for key, title in titles.items()}
+        wait(futures.values(), timeout=deadline)
+    finally:
+        # Do not block on lookups that missed the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for key, future in futures.items():
+        if future.done() and not future.cancelled() and future.exception() is None:
+            results[key] = future.result()
+        else:
+            results[key] = CONNECTION_FAILED
+    return results
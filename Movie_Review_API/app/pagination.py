@@ -0,0 +1,118 @@
+# Standard library imports
+import json  # Cursor positions are stored as small JSON arrays
+
+# Django imports
+from django.core.exceptions import ValidationError  # Cursor values the sort field cannot hold
+from django.core.paginator import InvalidPage  # Out-of-range and malformed page numbers
+from django.db.models import Q  # Keyset comparisons
+
+# DRF (Django REST Framework) imports
+from rest_framework.exceptions import NotFound  # Raised for malformed cursors
+from rest_framework.filters import OrderingFilter  # Reuse the view's ?ordering= handling
+from rest_framework.pagination import CursorPagination, Cursor, PageNumberPagination  # Base paginators and cursor helpers
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination over (field, id): each page is fetched with
+    `WHERE (field, id) < (last field, last id)` on a composite index, so page
+    1000 costs the same as page 1 and no COUNT(*) is run.
+
+    The sort field comes from the view's ?ordering= parameter when it is one
+    of `keyset_fields`; ties are broken by id in the same direction.
+    """
+
+    keyset_fields = ('created_at',)
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_keyset_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        term = ordering[0] if ordering else self.default_ordering
+        if term.lstrip('-') not in self.keyset_fields:
+            term = self.default_ordering
+        return term.lstrip('-'), term.startswith('-')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.field, descending = self.get_keyset_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        # Walking backwards (previous page) flips the sort and the comparison
+        backwards = descending != reverse
+        order = '-' if backwards else ''
+        queryset = queryset.order_by(f'{order}{self.field}', f'{order}id')
+
+        if self.cursor is not None:
+            try:
+                value, pk = json.loads(self.cursor.position)
+                # Cursors come back from clients: check the values before they reach the query
+                value, pk = queryset.model._meta.get_field(self.field).to_python(value), int(pk)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if backwards else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'id__{lookup}': pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def position_of(self, obj):
+        value = getattr(obj, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return json.dumps([value, obj.pk])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.position_of(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.position_of(self.page[0])))
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination that async views can await: the count and the page
+    rows go through the async ORM, and get_paginated_response() then works
+    as usual.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return [obj async for obj in queryset]
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()  # Counted here, so Paginator does not query
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        self.request = request
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return self.page.object_list
@@ -0,0 +1,186 @@
+# Standard library imports
+import asyncio  # Async views
+import contextlib  # primary_reads()
+import functools  # Keep the decorated view's name
+import random  # Spread reads over the replicas
+from contextvars import ContextVar  # Per-request (and per-task) routing flag
+
+# Django imports
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async  # Async-capable middleware
+from django.conf import settings  # Replica aliases and stickiness window
+from django.core.cache import caches  # Shared record of recent writers
+from django.http import JsonResponse  # Authentication errors of async views
+
+# DRF (Django REST Framework) imports
+from rest_framework.exceptions import AuthenticationFailed  # Bad credentials
+from rest_framework.permissions import SAFE_METHODS  # Methods that only read
+from rest_framework.request import Request  # Runs the authentication classes
+from rest_framework.settings import api_settings  # DEFAULT_AUTHENTICATION_CLASSES
+
+
+PIN_COOKIE = 'replica_pin'
+
+_use_replicas = ContextVar('use_replicas', default=False)
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica (settings.DATABASE_REPLICAS) while a view
+    has opted in with ReplicaReadMixin or replica_reads; everything else,
+    including every write, goes to the primary ('default').
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replicas.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema with the data (replication, or sync_replicas locally)
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def pin_to_primary(request, response):
+    """
+    After a write, keep this client on the primary for REPLICA_STICKY_SECONDS
+    so it reads its own writes while the replicas catch up: a cookie for
+    browsers and anonymous clients, a cache entry for authenticated users.
+    """
+    seconds = settings.REPLICA_STICKY_SECONDS
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        caches[settings.REPLICA_PIN_CACHE_ALIAS].set(_pin_key(user.pk), True, seconds)
+
+
+def reads_from_replica(request):
+    if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+        return False
+    if request.COOKIES.get(PIN_COOKIE):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return not caches[settings.REPLICA_PIN_CACHE_ALIAS].get(_pin_key(user.pk))
+    return True
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin clients to the primary after any successful unsafe request. DRF
+    copies the authenticated user (JWT included) onto the Django request, so
+    it is known here once the view has run.
+    """
+
+    sync_capable = True
+    async_capable = True  # A sync-only middleware would run async views in a thread under ASGI
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def should_pin(self, request, response):
+        return settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.should_pin(request, response):
+            pin_to_primary(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.should_pin(request, response):
+            await sync_to_async(pin_to_primary)(request, response)  # May load the session user
+        return response
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """
+    Send reads inside the block to the primary, even in a view reading from
+    the replicas.
+    """
+    token = _use_replicas.set(False)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+class ReplicaReadMixin:
+    """
+    Let a DRF read view query the replicas. The decision is taken in
+    initial(), after authentication, so a user who just wrote is kept on the primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _use_replicas.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _use_replicas.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if reads_from_replica(request):
+            _use_replicas.set(True)
+
+
+def api_user(request):
+    """
+    The user the API's authentication classes (JWT, then the session) find
+    for a plain Django request, as a DRF view would see it. Raises
+    AuthenticationFailed for bad credentials.
+    """
+    return Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]).user
+
+
+def replica_reads(view):
+    """
+    Decorator doing the same as ReplicaReadMixin for plain Django views,
+    sync or async. The async queries run in threads that inherit the flag.
+    Async views get request.user from the API's authentication classes, so
+    JWT clients are neither served anonymous payloads nor sent to a replica
+    right after writing.
+    """
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            try:
+                request.user = await sync_to_async(api_user)(request)  # May query the user or the session
+            except AuthenticationFailed as exc:
+                # Answered as DRF would: 401 with the first authentication class' challenge
+                detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+                response = JsonResponse(detail, status=exc.status_code)
+                challenge = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+                if challenge:
+                    response['WWW-Authenticate'] = challenge
+                return response
+            token = _use_replicas.set(reads_from_replica(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _use_replicas.reset(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _use_replicas.set(reads_from_replica(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replicas.reset(token)
+    return wrapper
@@ -0,0 +1,129 @@
+# Standard library imports
+import re  # Split search input into indexable words
+
+# Django imports
+from django.db import connections, OperationalError  # Raw SQL against the full-text index
+from django.db.models import BooleanField, FloatField  # Output types for raw search expressions
+from django.db.models.expressions import RawSQL  # Raw full-text expressions
+
+# DRF (Django REST Framework) imports
+from rest_framework import filters  # Base search filter
+
+
+FTS_TABLE = 'app_review_fts'  # SQLite FTS5 table mirroring Review.movie_title/review_content
+
+
+def pg_vector_sql(table):
+    # PostgreSQL: same expression as the GIN index created in migration 0008, so the planner can use it
+    return (
+        f"setweight(to_tsvector('english', coalesce({table}.movie_title, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({table}.review_content, '')), 'B')"
+    )
+
+
+_fts_available = {}  # (alias, database name) -> whether the FTS table exists; cleared after migrate
+
+
+def search_words(terms):
+    # Keep only word characters so user input cannot inject FTS/tsquery operators
+    return re.findall(r'\w+', ' '.join(terms))
+
+
+def fts_available(using):
+    """
+    Whether the SQLite FTS5 table exists on this database (FTS5 is optional in SQLite builds).
+    """
+    connection = connections[using]
+    key = (using, str(connection.settings_dict['NAME']))
+    if key not in _fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_available[key] = cursor.fetchone() is not None
+    return _fts_available[key]
+
+
+def forget_fts_probes():
+    # Migrations create (or drop) the FTS table: look again next time
+    _fts_available.clear()
+
+
+def index_reviews(reviews, using='default'):
+    """
+    Copy reviews into the SQLite full-text table. PostgreSQL indexes the
+    review table itself, so there is nothing to do there.
+    """
+    if connections[using].vendor != 'sqlite' or not fts_available(using):
+        return
+    rows = [(review.pk, review.movie_title, review.review_content) for review in reviews]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {FTS_TABLE}(rowid, movie_title, review_content) VALUES (%s, %s, %s)', rows)
+
+
+def unindex_review(review_id, using='default'):
+    if connections[using].vendor != 'sqlite' or not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [review_id])
+
+
+def search_reviews(queryset, terms):
+    """
+    Restrict a Review queryset to full-text matches of all `terms` (each also
+    matching as a prefix) and annotate `search_rank`, lower meaning more
+    relevant. Returns None when the database has no full-text index.
+    """
+    words = search_words(terms)
+    if not words:
+        return queryset.none()
+
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    if connection.vendor == 'sqlite' and fts_available(queryset.db):
+        match = ' '.join('"%s"*' % word for word in words)
+        pk = connection.ops.quote_name(queryset.model._meta.pk.column)
+        # The index picks the matching rows; the rank is read back for those rows only
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        rank = RawSQL(
+            f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '  # Title matches weigh more
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.{pk}',
+            [match], output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+    if connection.vendor == 'postgresql':
+        query = ' & '.join(f'{word}:*' for word in words)
+        vector = pg_vector_sql(table)
+        return queryset.filter(
+            RawSQL(f"({vector}) @@ to_tsquery('english', %s)", [query], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"-ts_rank({vector}, to_tsquery('english', %s))", [query], output_field=FloatField())
+        )
+
+    return None
+
+
+class ReviewSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the full-text index (SQLite FTS5 or PostgreSQL tsvector),
+    ranked by relevance unless the client asked for an explicit ?ordering=.
+    Falls back to DRF's LIKE search on databases without one.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if not search_words(terms):
+            return queryset.none()  # Only punctuation: nothing can match, and there is no rank to sort on
+        try:
+            results = search_reviews(queryset, terms)
+        except OperationalError:
+            results = None
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        if 'ordering' not in request.query_params:
+            results = results.order_by('search_rank', '-created_at')
+        return results
@@ -1,31 +1,102 @@
 # Django REST Framework (DRF) imports
 from rest_framework import serializers  # Import base serializer functionalities from DRF
+from rest_framework.reverse import reverse  # Absolute URLs for links in payloads
+from django.conf import settings  # Embedded comment limits
 
 # Local models and user model import
-from .models import Review  # Import the Review model to be serialized
+from .models import Review, Movie  # Import the Review model to be serialized
 from django.contrib.auth import get_user_model  # Use get_user_model in case of custom user model
 
 # Import nested serializers
 from reviewcomment.serializers import ReviewCommentSerializer  # Serializer for handling ReviewComment objects
 
-
-# Import the requests library
-import requests  # Allows making HTTP requests to interact with external APIs
+# Cached OMDb lookups
+from .omdb import fetch_movie_details, normalize_title  # Fetch movie details through the OMDb cache
 
 
 User=get_user_model()
 
-class ReviewSerializer(serializers.ModelSerializer):
-    comments = ReviewCommentSerializer(many=True, read_only=True)
+
+def embedded_comments_limit(request):
+    """
+    Number of latest comments to embed in each review, taken from the
+    `?comments=` query parameter and capped at REVIEW_COMMENTS_MAX_EMBEDDED.
+    """
+    limit = settings.REVIEW_COMMENTS_EMBEDDED
+    params = getattr(request, 'query_params', None) or getattr(request, 'GET', {})  # DRF or plain Django request
+    if 'comments' in params:
+        try:
+            limit = int(params['comments'])
+        except ValueError:
+            pass
+    return max(0, min(limit, settings.REVIEW_COMMENTS_MAX_EMBEDDED))
+
+
+class EmbeddedCommentsMixin:
+    """
+    Embeds only the latest comments of a review; the rest are reachable
+    through `comments_url`. Views prefetch them into `latest_comments`.
+    """
+
+    def get_comments(self, obj):
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            limit = embedded_comments_limit(self.context.get('request'))
+            if not limit:
+                return []
+            comments = obj.comments.select_related('user').order_by('-created_at', '-id')[:limit]
+        return ReviewCommentSerializer(comments, many=True, context=self.context).data
+
+    def get_comments_url(self, obj):
+        return reverse('review-comment-list', args=[obj.pk], request=self.context.get('request'))
+
+
+class ReviewListSerializer(serializers.ListSerializer):
+    """
+    Saves a validated list of reviews with one bulk INSERT. Every distinct
+    movie title is resolved once; missing OMDb details are fetched
+    concurrently, or left to the background worker when enrichment is asynchronous.
+    """
+
+    def create(self, validated_data):
+        movies = Movie.objects.resolve_titles(
+            (item['movie_title'] for item in validated_data),
+            fetch=not settings.ENRICH_REVIEWS_ASYNC,
+        )
+        reviews = []
+        for item in validated_data:
+            movie = movies.get(normalize_title(item['movie_title']))
+            item.setdefault('poster_url', movie.poster if movie else None)  # Attach poster URL
+            reviews.append(Review(movie=movie, **item))
+
+        reviews = Review.objects.bulk_create(reviews)
+        # New reviews have no comments yet
+        for review in reviews:
+            review.latest_comments = []
+        return reviews
+
+
+class ReviewSerializer(EmbeddedCommentsMixin, serializers.ModelSerializer):
+    comments = serializers.SerializerMethodField()  # Latest comments only
+    comments_url = serializers.SerializerMethodField()  # Full, paginated comment list
     username = serializers.CharField(source='user.username', read_only=True)  # Access username from the user relationship
     class Meta:
         model = Review
-        fields = ['id', 'movie_title', 'review_content', 'rating', 'username','poster_url','comments']
-        read_only_fields = ['username','comments','poster_url']
+        fields = ['id', 'movie_title', 'review_content', 'rating', 'username','poster_url','comment_count','comments','comments_url','updated_at']
+        read_only_fields = ['username','comments','poster_url','comment_count']
+        list_serializer_class = ReviewListSerializer
 
-    def get_movie_details(self, obj):
-        # Fetch movie details from OMDb using the movie title from the review
-        return fetch_movie_details(obj.movie_title)
+    def create(self, validated_data):
+        # The fields were validated above, so the model's full_clean() is skipped
+        review = Review(**validated_data)
+        review.save(validated=True)
+        return review
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(validated=True)
+        return instance
 
     def validate_rating(self, value):
         """
@@ -45,32 +116,25 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Review Content is required.")
         return data
 
-class ReviewDetailSerializer(serializers.ModelSerializer):
-    comments = ReviewCommentSerializer(many=True, read_only=True)
+class ReviewDetailSerializer(EmbeddedCommentsMixin, serializers.ModelSerializer):
+    comments = serializers.SerializerMethodField()  # Latest comments only
+    comments_url = serializers.SerializerMethodField()  # Full, paginated comment list
     username = serializers.CharField(source='user.username', read_only=True)  # Access username from the user relationship
     movie_details = serializers.SerializerMethodField()  # Custom field for movie details
     class Meta:
         model = Review
-        fields = ['id', 'movie_title', 'review_content', 'rating', 'username','movie_details','poster_url','comments']
-        read_only_fields = ['username','comments','poster_url']
+        fields = ['id', 'movie_title', 'review_content', 'rating', 'username','movie_details','poster_url','comment_count','comments','comments_url','updated_at']
+        read_only_fields = ['username','comments','poster_url','comment_count']
 
     def get_movie_details(self, obj):
-        # Fetch movie details from OMDb using the movie title from the review
-        return fetch_movie_details(obj.movie_title)
-
-
-def fetch_movie_details(movie_title):
-    api_key = '77f03f24'  # OMDb API key
-    url = f'http://www.omdbapi.com/?t={movie_title}&apikey={api_key}'
-
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()  # Return the movie details as a dictionary
-        else:
-            return {'error': 'Movie not found'}
-    except requests.RequestException:
-        return {'error': 'Failed to connect to OMDb'}
+        # The async views look the details up beforehand, without blocking
+        if 'movie_details' in self.context:
+            return self.context['movie_details']
+        # Serve the stored movie metadata; OMDb is only asked when it is missing or stale
+        if obj.movie is None:
+            return fetch_movie_details(obj.movie_title)
+        return obj.movie.get_details()
+
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -0,0 +1,188 @@
+# Django imports
+from django.conf import settings  # Whether tokens carry user claims
+from django.db import transaction  # Invalidate cached responses only once changes are committed
+from django.db.models import F  # Atomic counter updates
+from django.db.models.functions import Greatest  # Counters never go below zero
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed, post_migrate  # Model and schema lifecycle signals
+from django.dispatch import receiver  # Decorator for connecting signal handlers
+from django.utils import timezone  # Review modification times
+
+# Local app imports
+from .models import Review, Movie, MovieStats, User, reviews_bulk_created, review_likes_changed  # Reviews and the stats they feed
+from .search import index_reviews, unindex_review, forget_fts_probes  # Full-text index sync
+from .caching import invalidate, review_scope, REVIEWS, LEADERBOARD, MOVIES  # Response cache scopes
+from .backends import forget_cached_user, mark_user_changed  # Cached users for session and JWT authentication
+from .authentication import revoke_user_tokens  # Tokens carrying outdated claims
+
+# ReviewComment-related imports
+from reviewcomment.models import ReviewComment  # Comments are embedded in review payloads
+
+
+@receiver(post_save, sender=Review)
+def update_movie_stats_on_save(sender, instance, created, **kwargs):
+    previous_movie_id, previous_rating = instance.saved_value('movie_id'), instance.saved_value('rating')
+    if created:
+        MovieStats.objects.apply_delta(instance.movie_id, 1, instance.rating, instance.created_at)
+    elif instance.changed_fields():
+        # Move the review out of its old numbers and into the new ones
+        if previous_movie_id is not None:
+            MovieStats.objects.apply_delta(previous_movie_id, -1, -previous_rating)
+            if previous_movie_id != instance.movie_id:
+                MovieStats.objects.refresh_last_reviewed(previous_movie_id)
+        MovieStats.objects.apply_delta(instance.movie_id, 1, instance.rating, instance.created_at)
+
+
+@receiver(post_delete, sender=Review)
+def update_movie_stats_on_delete(sender, instance, **kwargs):
+    movie_id, rating = instance.saved_value('movie_id', instance.movie_id), instance.saved_value('rating', instance.rating)
+    if movie_id is not None:
+        MovieStats.objects.apply_delta(movie_id, -1, -rating)
+        MovieStats.objects.refresh_last_reviewed(movie_id)
+
+
+@receiver(reviews_bulk_created, sender=Review)
+def update_movie_stats_on_bulk_create(sender, reviews, **kwargs):
+    # One delta per movie, written in bulk
+    deltas = {}
+    for review in reviews:
+        if review.movie_id is None:
+            continue
+        count, total, latest = deltas.get(review.movie_id, (0, 0, review.created_at))
+        deltas[review.movie_id] = (count + 1, total + review.rating, max(latest, review.created_at))
+    MovieStats.objects.apply_deltas(deltas)
+
+
+@receiver(post_save, sender=Review)
+def update_search_index_on_save(sender, instance, using, **kwargs):
+    index_reviews([instance], using=using)
+
+
+@receiver(post_delete, sender=Review)
+def update_search_index_on_delete(sender, instance, using, **kwargs):
+    unindex_review(instance.pk, using=using)
+
+
+@receiver(reviews_bulk_created, sender=Review)
+def update_search_index_on_bulk_create(sender, reviews, **kwargs):
+    index_reviews(reviews)
+
+
+@receiver(post_migrate)
+def reprobe_search_index_after_migrate(sender, **kwargs):
+    # A probe from before migration 0008 ran would otherwise disable full-text search for good
+    forget_fts_probes()
+
+
+@receiver(post_save, sender=ReviewComment)
+def update_review_on_comment_save(sender, instance, created, using, **kwargs):
+    # Every way of adding or editing a comment (API, admin, ORM) changes the review's
+    # embedded comments; new ones are counted in the same UPDATE
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Review.objects.using(using).filter(pk=instance.review_id).update(**changes)
+
+
+@receiver(post_delete, sender=ReviewComment)
+def update_review_on_comment_delete(sender, instance, using, **kwargs):
+    Review.objects.using(using).filter(pk=instance.review_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0), updated_at=timezone.now()
+    )
+
+
+def invalidate_on_commit(*scopes, using='default'):
+    # Invalidating before commit would let a concurrent request cache the old rows again
+    transaction.on_commit(lambda: invalidate(*scopes), using=using)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_responses_on_review_change(sender, instance, using, **kwargs):
+    invalidate_on_commit(REVIEWS, LEADERBOARD, review_scope(instance.pk), using=using)
+
+
+@receiver(reviews_bulk_created, sender=Review)
+def invalidate_responses_on_bulk_create(sender, reviews, **kwargs):
+    invalidate_on_commit(REVIEWS, LEADERBOARD)
+
+
+@receiver(post_save, sender=Movie)
+def invalidate_responses_on_movie_change(sender, instance, created, using, **kwargs):
+    if not created:
+        # New posters and details show up in every review of the movie and on the leaderboard
+        invalidate_on_commit(REVIEWS, LEADERBOARD, MOVIES, using=using)
+
+
+@receiver(post_save, sender=ReviewComment)
+@receiver(post_delete, sender=ReviewComment)
+def invalidate_responses_on_comment_change(sender, instance, using, **kwargs):
+    invalidate_on_commit(REVIEWS, review_scope(instance.review_id), using=using)
+
+
+@receiver(review_likes_changed, sender=Review)
+def invalidate_responses_on_like(sender, review_id, using, **kwargs):
+    invalidate_on_commit(REVIEWS, review_scope(review_id), using=using)
+
+
+def update_like_counts(review_ids, delta, using):
+    # One UPDATE: every review here gains or loses the same number of likes
+    if review_ids:
+        Review.objects.using(using).filter(pk__in=review_ids).update(
+            like_count=Greatest(F('like_count') + delta, 0), updated_at=timezone.now()
+        )
+        invalidate_on_commit(REVIEWS, *(review_scope(review_id) for review_id in review_ids), using=using)
+
+
+@receiver(m2m_changed, sender=Review.liked_by.through)
+def update_likes_on_liked_by_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # review.liked_by.add()/remove()/clear() and user.liked_reviews.*, e.g. from the admin; add_like()
+    # and remove_like() write the likes table directly and count their own. Removals are counted
+    # before they happen, from the rows that exist, in the same transaction as the delete.
+    if action == 'post_add':
+        if reverse:
+            update_like_counts(list(pk_set), 1, using)
+        else:
+            update_like_counts([instance.pk], len(pk_set), using)
+    elif action in ('pre_remove', 'pre_clear'):
+        likes = sender.objects.using(using).filter(**{'user_id' if reverse else 'review_id': instance.pk})
+        if action == 'pre_remove':
+            likes = likes.filter(**{'review_id__in' if reverse else 'user_id__in': pk_set})
+        if reverse:
+            update_like_counts(list(likes.values_list('review_id', flat=True)), -1, using)
+        else:
+            update_like_counts([instance.pk], -likes.count(), using)
+
+
+@receiver(pre_delete, sender=User)
+def update_likes_on_user_delete(sender, instance, using, **kwargs):
+    # The user's likes go with them in a cascade that sends no m2m_changed
+    liked = Review.liked_by.through.objects.using(using).filter(user_id=instance.pk)
+    update_like_counts(list(liked.values_list('review_id', flat=True)), -1, using)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user_on_change(sender, instance, using, **kwargs):
+    # Now, so this request sees the change, and after commit, in case a
+    # concurrent request cached the old row in between
+    forget_cached_user(instance.pk)
+    transaction.on_commit(lambda: forget_cached_user(instance.pk), using=using)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, created, **kwargs):
+    # A login (last_login only) changes nothing tracked
+    changed = set(instance.changed_fields())
+    if created or not changed:
+        return
+    # A new password or deactivation always logs the user out; the claims only matter
+    # when requests trust them (JWT_TOKEN_USERS), otherwise every request reloads the user
+    if changed & set(User.REVOKING_FIELDS) or (settings.JWT_TOKEN_USERS and changed & set(User.TOKEN_CLAIM_FIELDS)):
+        revoke_user_tokens(instance.pk)
+    else:
+        mark_user_changed(instance.pk)  # Other processes still reload their cached copy
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,44 @@
+# Background job handlers, discovered by the `worker` management command
+
+# Django imports
+from django.utils import timezone  # Mark enriched reviews as modified
+
+# Local app imports
+from .jobs import register, enqueue, enqueue_many, RetryJob  # Job registry
+from .models import Movie, Review  # Models enriched with OMDb data
+from .omdb import CONNECTION_FAILED  # Marker for an unreachable OMDb
+from .caching import invalidate, REVIEWS, MOVIES  # Cached responses showing the old posters
+
+
+ENRICH_MOVIE = 'enrich_movie'
+
+
+@register(ENRICH_MOVIE)
+def enrich_movie(movie_id):
+    """
+    Fetch OMDb metadata for a movie and copy its poster onto the movie's
+    reviews that do not have one yet. Safe to run more than once.
+    """
+    try:
+        movie = Movie.objects.get(pk=movie_id)
+    except Movie.DoesNotExist:
+        return  # Nothing left to enrich
+
+    if movie.needs_refresh():
+        data = movie.get_details()
+        if data == CONNECTION_FAILED:
+            raise RetryJob('OMDb is unreachable')
+
+    if movie.poster:
+        if Review.objects.filter(movie=movie, poster_url__isnull=True).update(poster_url=movie.poster, updated_at=timezone.now()):
+            invalidate(REVIEWS, MOVIES)  # update() sends no signals
+
+
+def enqueue_enrich_movie(movie):
+    # One live job per movie, however many reviews are waiting for its poster
+    return enqueue(ENRICH_MOVIE, movie.pk, {'movie_id': movie.pk})
+
+
+def enqueue_enrich_movies(movies):
+    # Bulk version for uploads and imports touching many movies
+    return enqueue_many(ENRICH_MOVIE, {movie.pk: {'movie_id': movie.pk} for movie in movies})
@@ -1,24 +1,1251 @@
-from django.test import TestCase, Client
+import asyncio
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipIf
+from urllib.parse import urlencode, urlparse, parse_qs
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, SimpleTestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model  # Import the custom user model
-from .models import Review
+from django.contrib.auth import authenticate, get_user
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from .models import Review, Movie, MovieStats, Job
+from . import backends, jobs, omdb, search
+from .authentication import TokenUserJWTAuthentication, revoke_user_tokens
+from .caching import cached_payload, get_cache
+from .checks import check_replica_pin_cache
+from .views import MAX_BATCH_LIKES
+from .signals import reprobe_search_index_after_migrate
+from .routers import ReplicaRouter, ReplicaStickinessMiddleware, reads_from_replica, replica_reads
+from reviewcomment.models import ReviewComment
 
 User = get_user_model()  # Get the custom User model
 
-def test_most_reviewed_movies_authenticated(self):
-    # Log in the user and check if login is successful
-    login_successful = self.client.login(username='testuser', password='testpassword')
-    self.assertTrue(login_successful, "User login failed")
+# OMDb lookups cached in memory, so tests neither read nor wipe the real file cache
+isolated_omdb_cache = override_settings(CACHES={**settings.CACHES, 'omdb': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-omdb',
+}})
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class MostReviewedMoviesViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('testuser@example.com', 'testuser', 'testpassword')
+        for title in ('Movie 1', 'Movie 1', 'Movie 2'):
+            Review.objects.create(movie_title=title, review_content='Good', rating=4, user=self.user)
+
+    def test_most_reviewed_movies_authenticated(self):
+        # Log in the user and check if login is successful
+        login_successful = self.client.login(email='testuser@example.com', password='testpassword')
+        self.assertTrue(login_successful, "User login failed")
+
+        # Make a GET request to the view
+        response = self.client.get(reverse('most_reviewed_movies'))
+
+        # Assert that the correct template is used for authenticated users
+        self.assertTemplateUsed(response, 'most_reviewed_movies.html')
+
+        # Assert that the response contains the most reviewed movies
+        most_reviewed_movies = response.context['most_reviewed_movies']
+        self.assertEqual(len(most_reviewed_movies), 2)  # There should be two movies
+        self.assertEqual(most_reviewed_movies[0]['movie_title'], 'Movie 1')  # Movie 1 has more reviews
+
+
+class MovieStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('stats@example.com', 'stats', 'password')
+        self.first = Review.objects.create(movie_title='Up', review_content='Good', rating=4, user=self.user)
+        self.second = Review.objects.create(movie_title='Up', review_content='Fine', rating=2, user=self.user)
+
+    def stats(self, lookup_key):
+        row = MovieStats.objects.get(movie__lookup_key=lookup_key)
+        return row.review_count, row.rating_sum, row.average_rating
+
+    def assertMatchesRebuild(self):
+        # The incremental updates must agree with a full recount
+        fields = ('movie_id', 'review_count', 'rating_sum', 'average_rating', 'last_reviewed_at')
+        incremental = list(MovieStats.objects.filter(review_count__gt=0).order_by('movie_id').values_list(*fields))
+        MovieStats.objects.rebuild()
+        self.assertEqual(incremental, list(MovieStats.objects.order_by('movie_id').values_list(*fields)))
+
+    def test_rating_edits(self):
+        self.assertEqual(self.stats('up'), (2, 6, 3.0))
+        self.first.rating = 5
+        self.first.save()
+        self.first.save()  # Saving again without changes counts nothing
+        self.assertEqual(self.stats('up'), (2, 7, 3.5))
+        self.assertMatchesRebuild()
+
+    def test_moving_a_review_to_another_movie(self):
+        self.second.movie_title = 'Heat'
+        self.second.rating = 5
+        self.second.save()
+        self.assertEqual(self.stats('up'), (1, 4, 4.0))
+        self.assertEqual(self.stats('heat'), (1, 5, 5.0))
+        self.assertEqual(MovieStats.objects.get(movie__lookup_key='up').last_reviewed_at, self.first.created_at)
+        self.assertMatchesRebuild()
+
+    def test_deletes(self):
+        self.second.delete()
+        self.assertEqual(self.stats('up'), (1, 4, 4.0))
+        self.assertMatchesRebuild()
+        self.first.delete()
+        self.assertEqual(self.stats('up'), (0, 0, None))
+
+    def test_bulk_created_reviews(self):
+        up, heat = Movie.objects.get(lookup_key='up'), Movie.objects.for_title('Heat')
+        Review.objects.bulk_create([
+            Review(movie=movie, movie_title=movie.title, review_content='Bulk', rating=rating, user=self.user)
+            for movie, rating in ((up, 3), (heat, 5), (heat, 4))
+        ])
+        self.assertEqual(self.stats('up'), (3, 9, 3.0))
+        self.assertEqual(self.stats('heat'), (2, 9, 4.5))
+        self.assertMatchesRebuild()
+
+
+class ReviewValidationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('valid@example.com', 'valid', 'password')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_direct_saves_still_run_model_validation(self):
+        for changes in ({'rating': 9}, {'rating': 0}, {'movie_title': ''}):
+            fields = {'movie_title': 'Up', 'review_content': 'Good', 'rating': 4, 'user': self.user, **changes}
+            with self.assertRaises(ValidationError, msg=changes):
+                Review(**fields).save()
+        self.assertFalse(Review.objects.exists())
+
+    def test_serializer_rejects_what_the_model_would(self):
+        response = self.api.post(reverse('review-create'), {'movie_title': 'Up', 'review_content': 'Good', 'rating': 9})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rating', response.json())
+
+    def test_one_invalid_item_rejects_the_whole_batch(self):
+        batch = [
+            {'movie_title': 'Up', 'review_content': 'Good', 'rating': 4},
+            {'movie_title': 'Heat', 'review_content': 'Tense', 'rating': 0},
+        ]
+        response = self.api.post(reverse('review-create'), batch, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('rating', response.json()[1])
+        self.assertFalse(Review.objects.exists())
+        self.assertFalse(Movie.objects.exists())
+
+        batch[1]['rating'] = 5
+        self.assertEqual(self.api.post(reverse('review-create'), batch, format='json').status_code, 201)
+        self.assertEqual(Review.objects.count(), 2)
+
+
+class OMDbStubServer:
+    """
+    Local stand-in for OMDb. `movies` maps titles to payloads; `status` and
+    `delay` make every response fail or stall, `body` replaces every payload,
+    and `hits` counts requests.
+    """
+
+    def __init__(self, movies=None):
+        self.movies = movies if movies is not None else {}
+        self.status = 200
+        self.delay = 0
+        self.body = None
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                title = parse_qs(urlparse(self.path).query).get('t', [''])[0]
+                payload = stub.movies.get(title, {'Response': 'False', 'Error': 'Movie not found!'})
+                if stub.body is not None:
+                    payload = stub.body
+                body = json.dumps(payload).encode()
+                try:
+                    self.send_response(stub.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up after its read timeout
+
+            def log_message(self, format, *args):
+                pass  # Keep test output quiet
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OMDbClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = OMDbStubServer({'Up': {'Title': 'Up', 'Year': '2009', 'Response': 'True'}}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.status = 200
+        self.stub.delay = 0
+        self.stub.body = None
+        self.stub.hits = 0
+        self.client_ = omdb.OMDbClient(base_url=self.stub.url, read_timeout=0.5, retries=1, backoff=0,
+                                       failure_threshold=2, reset_timeout=60)
+
+    def tearDown(self):
+        self.client_.close()
+
+    def test_found_and_not_found(self):
+        self.assertEqual(self.client_.get_movie('Up')['Year'], '2009')
+        self.assertEqual(self.client_.get_movie('Nope'), omdb.MOVIE_NOT_FOUND)
+
+    def test_server_errors_are_retried(self):
+        self.stub.status = 503
+        self.assertEqual(self.client_.get_movie('Up'), omdb.CONNECTION_FAILED)
+        self.assertEqual(self.stub.hits, 2)  # First attempt plus one retry
+
+    def test_read_timeout(self):
+        self.stub.delay = 1
+        started = time.monotonic()
+        self.assertEqual(self.client_.get_movie('Up'), omdb.CONNECTION_FAILED)
+        self.assertLess(time.monotonic() - started, 1.9)
+
+    def test_payloads_that_are_not_objects_fail(self):
+        for body in (['Up'], 'Up', 3):
+            self.stub.body = body
+            self.assertEqual(self.client_.get_movie('Up'), omdb.CONNECTION_FAILED)
+        self.assertTrue(self.client_.breaker.is_open)  # Counted as failures, not successes
+
+    def test_trial_that_raises_does_not_wedge_the_breaker(self):
+        self.stub.status = 500
+        self.client_.get_movie('Up')
+        self.client_.get_movie('Up')
+        self.stub.status = 200
+        self.client_.breaker.opened_at -= 61  # reset_timeout has passed: the next call is the trial
+        with mock.patch.object(self.client_.session, 'get', side_effect=UnicodeError):
+            with self.assertRaises(UnicodeError):
+                self.client_.get_movie('Up')
+        self.assertTrue(self.client_.breaker.is_open)
+
+        self.client_.breaker.opened_at -= 61
+        self.assertEqual(self.client_.get_movie('Up')['Year'], '2009')  # A new trial closes it
+        self.assertFalse(self.client_.breaker.is_open)
+
+    def test_breaker_short_circuits_after_failures(self):
+        self.stub.status = 500
+        self.client_.get_movie('Up')
+        self.client_.get_movie('Up')
+        self.assertTrue(self.client_.breaker.is_open)
+
+        hits = self.stub.hits
+        self.stub.status = 200
+        self.assertEqual(self.client_.get_movie('Up'), omdb.CONNECTION_FAILED)
+        self.assertEqual(self.stub.hits, hits)  # OMDb was not called while the breaker is open
+
+
+@skipIf(omdb.httpx is None, 'httpx is not installed')
+class AsyncOMDbClientTests(SimpleTestCase):
+    """
+    The httpx path of AsyncOMDbClient, against the same stub as the blocking client.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = OMDbStubServer({'Up': {'Title': 'Up', 'Year': '2009', 'Response': 'True'}}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.status = 200
+        self.stub.delay = 0
+        self.stub.body = None
+        self.stub.hits = 0
+        self.sync_client = omdb.OMDbClient(base_url=self.stub.url, read_timeout=0.5, retries=1, backoff=0,
+                                           failure_threshold=2, reset_timeout=60)
+
+    def tearDown(self):
+        self.sync_client.close()
+
+    def get_movies(self, *titles):
+        async def run():
+            client = omdb.AsyncOMDbClient(self.sync_client)
+            try:
+                return [await client.get_movie(title) for title in titles]
+            finally:
+                await client.aclose()
+        return asyncio.run(run())
+
+    def test_found_and_not_found(self):
+        up, nope = self.get_movies('Up', 'Nope')
+        self.assertEqual(up['Year'], '2009')
+        self.assertEqual(nope, omdb.MOVIE_NOT_FOUND)
+
+    def test_server_errors_are_retried(self):
+        self.stub.status = 503
+        self.assertEqual(self.get_movies('Up'), [omdb.CONNECTION_FAILED])
+        self.assertEqual(self.stub.hits, 2)  # First attempt plus one retry
+
+    def test_payloads_that_are_not_objects_fail(self):
+        self.stub.body = ['Up']
+        self.assertEqual(self.get_movies('Up', 'Up'), [omdb.CONNECTION_FAILED] * 2)
+        self.assertTrue(self.sync_client.breaker.is_open)
+
+    def test_trial_that_raises_does_not_wedge_the_breaker(self):
+        self.stub.body = ['Up']
+        self.get_movies('Up', 'Up')
+        self.stub.body = None
+        self.sync_client.breaker.opened_at -= 61
+        with mock.patch.object(omdb.OMDbClient, 'parse_response', side_effect=KeyError):
+            with self.assertRaises(KeyError):
+                self.get_movies('Up')
+        self.sync_client.breaker.opened_at -= 61
+        self.assertEqual(self.get_movies('Up')[0]['Year'], '2009')
+
+    def test_breaker_short_circuits_after_failures(self):
+        self.stub.status = 500
+        self.get_movies('Up', 'Up')
+        self.assertTrue(self.sync_client.breaker.is_open)
+
+        hits = self.stub.hits
+        self.stub.status = 200
+        self.assertEqual(self.get_movies('Up'), [omdb.CONNECTION_FAILED])
+        self.assertEqual(self.stub.hits, hits)
+
+    def test_replaced_clients_are_closed(self):
+        previous = omdb.get_client()
+
+        async def run():
+            omdb.set_client(self.sync_client)
+            first = omdb.get_async_client()
+            omdb.set_client(omdb.OMDbClient(base_url=self.stub.url))
+            second = omdb.get_async_client()
+            await asyncio.sleep(0)  # Let the close task run
+            closed = first.session.is_closed
+            await second.aclose()
+            return closed, second is not first
+
+        try:
+            self.assertEqual(asyncio.run(run()), (True, True))
+        finally:
+            omdb.get_client().close()
+            omdb.set_client(previous)
+
+
+@isolated_omdb_cache
+@override_settings(OMDB_CACHE_TTL=3600, OMDB_NEGATIVE_CACHE_TTL=60)
+class MovieDetailsCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = OMDbStubServer({'Up': {'Title': 'Up', 'Year': '2009', 'Response': 'True'}}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.status = 200
+        self.stub.hits = 0
+        omdb.movie_cache.clear()
+        omdb.movie_cache.reset_stats()
+        omdb.set_client(omdb.OMDbClient(base_url=self.stub.url, retries=0))
+        self.addCleanup(omdb.set_client, None)
+
+    def later(self, seconds):
+        # Both tiers: the local LRU reads time.monotonic(), LocMemCache time.time()
+        monotonic, now = time.monotonic() + seconds, time.time() + seconds
+        return mock.patch.multiple(time, monotonic=lambda: monotonic, time=lambda: now)
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = omdb.MovieDetailsCache()
+        cache.set('up', {'Title': 'Up'})
+        cache.set('nope', omdb.MOVIE_NOT_FOUND)
+        with self.later(61):
+            self.assertEqual(cache.get('up'), (True, {'Title': 'Up'}))
+            self.assertEqual(cache.get('nope'), (False, None))
+        with self.later(3601):
+            self.assertEqual(cache.get('up'), (False, None))
+
+    def test_not_found_is_cached_but_connection_failures_are_not(self):
+        self.assertEqual(omdb.fetch_movie_details('Nope'), omdb.MOVIE_NOT_FOUND)
+        self.assertEqual(omdb.fetch_movie_details('  nope '), omdb.MOVIE_NOT_FOUND)
+        self.assertEqual(self.stub.hits, 1)
+
+        self.stub.status = 500
+        self.assertEqual(omdb.fetch_movie_details('Up'), omdb.CONNECTION_FAILED)
+        self.stub.status = 200
+        self.assertEqual(omdb.fetch_movie_details('Up')['Year'], '2009')
+        self.assertEqual(self.stub.hits, 3)
+
+    def test_shared_entries_are_promoted_and_counted(self):
+        omdb.movie_cache.set('up', {'Title': 'Up'})
+        other_process = omdb.MovieDetailsCache()  # Empty local tier, same shared tier
+        self.assertEqual(other_process.get('up'), (True, {'Title': 'Up'}))
+        omdb.movie_cache.shared.clear()
+        self.assertEqual(other_process.get('up'), (True, {'Title': 'Up'}))  # Now from its LRU
+        self.assertEqual(other_process.get('down'), (False, None))
+        self.assertEqual(other_process.stats(), {'local_hits': 1, 'shared_hits': 1, 'misses': 1})
+
+    def test_local_tier_evicts_the_least_recently_used(self):
+        local = omdb.LocalTTLCache(max_size=2)
+        local.set('a', 1, 60)
+        local.set('b', 2, 60)
+        local.get('a')
+        local.set('c', 3, 60)
+        self.assertEqual([local.get(key)[0] for key in 'abc'], [True, False, True])
+
+
+class ConcurrentLookupTests(TestCase):
+    """
+    fetch_many_movie_details() and resolve_titles() with OMDb replaced by
+    fake_fetch(), which the bulk paths call from their thread pool.
+    """
+
+    def setUp(self):
+        self.fetched = []
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)  # Let a stalled lookup finish
+        patcher = mock.patch.object(omdb, 'fetch_movie_details', self.fake_fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_fetch(self, movie_title):
+        self.fetched.append(movie_title)
+        if movie_title == 'Slow':
+            self.release.wait(5)
+        if movie_title == 'Boom':
+            raise RuntimeError('Unexpected OMDb answer')
+        if movie_title == 'Nope':
+            return omdb.MOVIE_NOT_FOUND
+        return {'Title': movie_title, 'Year': '2009', 'Poster': f'http://img/{movie_title}.jpg', 'Response': 'True'}
+
+    def test_titles_are_deduplicated(self):
+        results = omdb.fetch_many_movie_details(['Up', ' up ', 'UP', 'Heat', '', '   '])
+        self.assertEqual(sorted(results), ['heat', 'up'])
+        self.assertEqual(sorted(self.fetched), ['Heat', 'Up'])
+
+    def test_failures_and_the_deadline_only_affect_their_own_titles(self):
+        started = time.monotonic()
+        results = omdb.fetch_many_movie_details(['Up', 'Slow', 'Boom'], deadline=0.2)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(results['up']['Year'], '2009')
+        self.assertEqual(results['slow'], omdb.CONNECTION_FAILED)
+        self.assertEqual(results['boom'], omdb.CONNECTION_FAILED)
+
+    def test_resolve_titles_fetches_only_what_is_missing(self):
+        fresh = Movie.objects.create(title='Heat', lookup_key='heat', details={'Title': 'Heat'}, fetched_at=timezone.now())
+        movies = Movie.objects.resolve_titles(['Up', 'up', 'Heat', 'Nope', 'Boom'])
+        self.assertEqual(sorted(self.fetched), ['Boom', 'Nope', 'Up'])
+        self.assertEqual(movies['heat'], fresh)
+
+        up, nope, boom = (Movie.objects.get(lookup_key=key) for key in ('up', 'nope', 'boom'))
+        self.assertEqual((up.year, up.poster), ('2009', 'http://img/Up.jpg'))
+        self.assertEqual(nope.details, omdb.MOVIE_NOT_FOUND)
+        self.assertIsNone(boom.fetched_at)  # Left for the next read to retry
+
+        self.fetched.clear()
+        Movie.objects.resolve_titles(['Up', 'Nope', 'Boom'])
+        self.assertEqual(self.fetched, ['Boom'])
+
+
+class BackfillMoviesMigrationTests(TransactionTestCase):
+    """
+    Migration 0003 against reviews written before movies existed.
+    """
+    migrate_from = [('app', '0002_movie')]
+    migrate_to = [('app', '0003_backfill_movies')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()  # Pick up the previous migration run
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_reviews_are_linked_to_one_movie_per_normalized_title(self):
+        apps = self.migrate(self.migrate_from)
+        OldReview = apps.get_model('app', 'Review')
+        user = apps.get_model('app', 'User').objects.create(username='old', email='old@example.com')
+        titles_and_posters = [
+            ('The Matrix', None), ('the  matrix ', 'http://img/matrix.jpg'), ('THE MATRIX', 'http://img/other.jpg'),
+            ('Up', None), ('   ', None),
+        ]
+        for title, poster in titles_and_posters:
+            OldReview.objects.create(movie_title=title, review_content='Old', rating=4, user=user, poster_url=poster)
+
+        apps = self.migrate(self.migrate_to)
+        Movie, Review = apps.get_model('app', 'Movie'), apps.get_model('app', 'Review')
+        self.assertEqual(
+            sorted(Movie.objects.values_list('lookup_key', 'title', 'poster')),
+            [('the matrix', 'The Matrix', 'http://img/matrix.jpg'), ('up', 'Up', None)],
+        )
+        linked = Review.objects.values_list('movie_title', 'movie__lookup_key')
+        self.assertEqual(sorted(linked, key=lambda row: row[0]), sorted([
+            ('The Matrix', 'the matrix'), ('the  matrix ', 'the matrix'), ('THE MATRIX', 'the matrix'),
+            ('Up', 'up'), ('   ', None),
+        ], key=lambda row: row[0]))
+
+
+class QueryBudgetMixin:
+    """
+    assertQueryBudget(url, budget) fails when a GET to `url` runs more than
+    `budget` SQL queries, listing the queries that ran.
+    """
+
+    def assertQueryBudget(self, url, budget, client=None, **params):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        if len(queries) > budget:
+            executed = '\n'.join(query['sql'] for query in queries.captured_queries)
+            self.fail(f'{url} ran {len(queries)} queries, budget is {budget}:\n{executed}')
+        return response
+
+
+@isolated_omdb_cache
+@override_settings(RESPONSE_CACHE_ENABLED=False)  # Measure the queries behind a response, not the cache
+class ReviewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.users = [User.objects.create_user(f'user{n}@example.com', f'user{n}', 'password') for n in range(3)]
+        self.api.force_authenticate(self.users[0])
+
+    def add_reviews(self, count):
+        # Movies with stored details, so no OMDb call is involved
+        movie, created = Movie.objects.get_or_create(
+            lookup_key='up', defaults={'title': 'Up', 'details': {'Title': 'Up'}, 'fetched_at': timezone.now()},
+        )
+        for number in range(count):
+            review = Review.objects.create(movie=movie, movie_title='Up', review_content='Good', rating=4,
+                                           user=self.users[number % 3])
+            for user in self.users:
+                ReviewComment.objects.create(review=review, user=user, comment='Agreed')
+        return review
+
+    def test_review_list_is_constant(self):
+        self.add_reviews(2)
+        self.assertQueryBudget(reverse('review-list'), 3)  # COUNT, reviews, comments
+        self.add_reviews(8)
+        response = self.assertQueryBudget(reverse('review-list'), 3, page_size=10)
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_review_detail(self):
+        review = self.add_reviews(1)
+        self.assertQueryBudget(reverse('review-detail', args=[review.pk]), 3)  # version, review, comments
+
+    def test_most_liked_reviews(self):
+        self.add_reviews(5)
+        self.assertQueryBudget(reverse('most-liked-reviews', args=['Up']), 3)
+
+    def test_comment_list(self):
+        review = self.add_reviews(1)
+        self.assertQueryBudget(reverse('review-comment-list', args=[review.pk]), 2, client=self.api)  # version, comments
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('keyset@example.com', 'keyset', 'password')
+        for rating in (5, 3, 5, 1, 3, 5, 4):
+            Review.objects.create(movie_title='Up', review_content='Good', rating=rating, user=user)
+        Review.objects.update(created_at=timezone.now())  # Every review ties on the default sort key
+
+    def walk(self, **params):
+        # Follow the next links from the first page, then the previous links back
+        pages, url = [], reverse('review-list')
+        params = {'pagination': 'cursor', 'page_size': 2, **params}
+        while url:
+            body = self.client.get(url, params).json()
+            pages.append([review['id'] for review in body['results']])
+            url, params = body['next'], None
+        backwards, url = [pages[-1]], body['previous']
+        while url:
+            body = self.client.get(url).json()
+            backwards.insert(0, [review['id'] for review in body['results']])
+            url = body['previous']
+        self.assertEqual(backwards, pages)
+        return [pk for page in pages for pk in page]
+
+    def test_ties_are_broken_by_id(self):
+        ids = list(Review.objects.values_list('id', flat=True))
+        self.assertEqual(self.walk(), sorted(ids, reverse=True))
+
+    def test_rating_ordering(self):
+        expected = list(Review.objects.order_by('rating', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk(ordering='rating'), expected)
+        expected = list(Review.objects.order_by('-rating', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(ordering='-rating'), expected)
+
+    def test_tampered_cursor_is_not_found(self):
+        url = reverse('review-list')
+        for position in ('["not a date", 1]', '["2024-01-01T00:00:00+00:00", "x"]', '5', 'nonsense'):
+            cursor = base64.b64encode(urlencode({'p': position}).encode()).decode()
+            response = self.client.get(url, {'pagination': 'cursor', 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+        response = self.client.get(url, {'pagination': 'cursor', 'ordering': 'rating', 'cursor': base64.b64encode(
+            urlencode({'p': '["five", 1]'}).encode()).decode()})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(url, {'pagination': 'cursor', 'cursor': '%%%'}).status_code, 404)
+
+
+@isolated_omdb_cache
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user('cache@example.com', 'cache', 'password')
+        self.movie = Movie.objects.create(title='Up', lookup_key='up', details={'Title': 'Up'}, fetched_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = Review.objects.create(movie=self.movie, movie_title='Up', review_content='Good', rating=4,
+                                                user=self.user)
+
+    def test_anonymous_reads_are_cached(self):
+        url = reverse('review-detail', args=[self.review.pk])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(1):  # The ETag version lookup only
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['id'], self.review.pk)
+
+    def test_likes_and_comments_invalidate(self):
+        most_liked = reverse('most-liked-reviews', args=['Up'])
+        self.client.get(most_liked)
+        self.client.get(reverse('review-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.add_like(self.review.pk, self.user.pk)
+        self.assertEqual(self.client.get(most_liked)['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReviewComment.objects.create(review=self.review, user=self.user, comment='Agreed')
+        response = self.client.get(reverse('review-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['comments'][0]['comment'], 'Agreed')
+
+    def test_comment_count_follows_orm_writes(self):
+        comment = ReviewComment.objects.create(review=self.review, user=self.user, comment='Agreed')
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.comment_count, 1)
+        comment.delete()
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.comment_count, 0)
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale = Review.objects.get(pk=self.review.pk)
+        Review.objects.add_like(self.review.pk, self.user.pk)
+        ReviewComment.objects.create(review=self.review, user=self.user, comment='Agreed')
+        stale.review_content = 'Better on a second watch'
+        stale.save()
+        self.review.refresh_from_db()
+        self.assertEqual((self.review.like_count, self.review.comment_count), (1, 1))
+        self.assertEqual(self.review.review_content, 'Better on a second watch')
+
+    def test_reconciled_counters_invalidate(self):
+        detail = reverse('review-detail', args=[self.review.pk])
+        self.client.get(detail)
+        self.client.get(reverse('review-list'))
+        Review.objects.filter(pk=self.review.pk).update(comment_count=7)  # Drifted, without signals
+        call_command('reconcile_counters', stdout=io.StringIO())
+        response = self.client.get(detail)
+        self.assertEqual((response['X-Cache'], response.json()['comment_count']), ('MISS', 0))
+        self.assertEqual(self.client.get(reverse('review-list'))['X-Cache'], 'MISS')
+
+    def test_authenticated_reads_bypass_cache(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get(reverse('review-list'))
+        self.assertNotIn('X-Cache', response)
+
+
+@isolated_omdb_cache
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('etag@example.com', 'etag', 'password')
+        movie = Movie.objects.create(title='Up', lookup_key='up', details={'Title': 'Up'}, fetched_at=timezone.now())
+        self.review = Review.objects.create(movie=movie, movie_title='Up', review_content='Good', rating=4,
+                                            user=self.user)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_unchanged_review_answers_304(self):
+        url = reverse('review-comment-list', args=[self.review.pk])
+        etag = self.api.get(url)['ETag']
+        with self.assertNumQueries(1):  # The version lookup only
+            response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.api.post(reverse('review-comment-create', args=[self.review.pk]), {'comment': 'Agreed'})
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_comments_added_outside_the_api_change_the_etag(self):
+        url = reverse('review-comment-list', args=[self.review.pk])
+        etag = self.api.get(url)['ETag']
+        ReviewComment.objects.create(review=self.review, user=self.user, comment='From the admin')
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        url = reverse('review-detail', args=[self.review.pk])
+        last_modified = self.api.get(url)['Last-Modified']
+        self.assertEqual(self.api.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.runs = []
+        jobs.register('test_job')(self.handler)
+        self.addCleanup(jobs.handlers.pop, 'test_job')
+
+    def handler(self, number):
+        self.runs.append(number)
+        if len(self.runs) == 1:
+            jobs.enqueue('test_job', 'key', {'number': 2})  # New work for the same key while it runs
+
+    @override_settings(JOBS_RUN_EAGERLY=True)
+    def test_enqueued_while_running_runs_again(self):
+        job = jobs.enqueue('test_job', 'key', {'number': 1})
+        self.assertEqual(self.runs, [1, 1])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rerun), (Job.DONE, False))
+
+    @override_settings(JOBS_RUN_EAGERLY=True)
+    def test_failed_job_waits_for_its_backoff(self):
+        jobs.register('failing_job')(self.failing_handler)
+        self.addCleanup(jobs.handlers.pop, 'failing_job')
+        job = jobs.enqueue('failing_job', 'key')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(jobs.claim_next())
+
+    def failing_handler(self):
+        raise jobs.RetryJob('OMDb is down')
+
+    def test_worker_requeues_expired_leases(self):
+        stale = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_SECONDS + 1)
+        Job.objects.create(kind='test_job', key='key', payload={'number': 1}, status=Job.RUNNING, attempts=1, locked_at=stale)
+        jobs.work(threading.Event(), once=True)
+        self.assertEqual(self.runs[0], 1)
+        self.assertEqual(Job.objects.get(kind='test_job', key='key').status, Job.DONE)
+
+    @override_settings(JOBS_RUN_EAGERLY=False)
+    def test_pending_jobs_absorb_new_requests(self):
+        job = jobs.enqueue('test_job', 'key', {'number': 1})
+        self.assertEqual(jobs.enqueue('test_job', 'key', {'number': 1}).pk, job.pk)
+        jobs.enqueue_many('test_job', {'key': {'number': 1}, 'other': {'number': 3}})
+        self.assertEqual(Job.objects.filter(kind='test_job').count(), 2)
+        self.assertFalse(Job.objects.filter(rerun=True).exists())
+
+
+class LikeEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('liker@example.com', 'liker', 'password')
+        self.review = Review.objects.create(movie_title='Up', review_content='Good', rating=4, user=self.user)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_like_and_unlike_are_idempotent(self):
+        like = reverse('like-review', args=[self.review.pk])
+        unlike = reverse('unlike-review', args=[self.review.pk])
+        self.assertEqual(self.api.post(like).json()['like_count'], 1)
+        response = self.api.post(like)
+        self.assertEqual((response.status_code, response.json()['like_count']), (400, 1))
+        self.assertEqual(self.api.post(unlike).json()['like_count'], 0)
+        response = self.api.post(unlike)
+        self.assertEqual((response.status_code, response.json()['like_count']), (400, 0))
+        self.assertEqual(self.api.post(reverse('like-review', args=[0])).status_code, 404)
+
+    def test_batch(self):
+        url = reverse('batch-like-reviews')
+        results = self.api.post(url, {'like': [self.review.pk, self.review.pk, 0, True, 'x']}, format='json').json()['results']
+        self.assertEqual([result.get('changed') for result in results], [True, False, None, None, None])
+        self.assertEqual([result.get('error') for result in results[2:]], ['Review not found', 'Invalid review id', 'Invalid review id'])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.like_count, 1)
+
+        results = self.api.post(url, {'unlike': [self.review.pk]}, format='json').json()['results']
+        self.assertEqual(results[0]['like_count'], 0)
+
+    def test_like_count_follows_orm_writes(self):
+        other = User.objects.create_user('other@example.com', 'other', 'password')
+        second = Review.objects.create(movie_title='Heat', review_content='Tense', rating=5, user=other)
+
+        def like_counts():
+            return [review.like_count for review in Review.objects.order_by('pk')]
+
+        self.review.liked_by.add(self.user, other)
+        self.review.liked_by.add(self.user)  # Already there: not counted twice
+        other.liked_reviews.add(second)
+        self.assertEqual(like_counts(), [2, 1])
+        self.review.liked_by.remove(self.user, self.user)
+        self.review.liked_by.remove(self.user)  # Not there any more
+        self.assertEqual(like_counts(), [1, 1])
+        self.user.liked_reviews.add(self.review, second)
+        other.liked_reviews.clear()
+        self.assertEqual(like_counts(), [1, 1])
+        self.review.liked_by.clear()
+        self.assertEqual(like_counts(), [0, 1])
+
+        self.review.liked_by.add(other)
+        other.delete()  # Also deletes `second`
+        self.assertEqual(like_counts(), [0])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_most_liked_breaks_ties_by_newest(self):
+        tied = [Review.objects.create(movie_title='Up', review_content='Tied', rating=3, user=self.user) for _ in range(3)]
+        Review.objects.add_like(tied[0].pk, self.user.pk)
+        results = self.api.get(reverse('most-liked-reviews', args=['Up'])).json()
+        self.assertEqual([review['id'] for review in results], [tied[0].pk, tied[2].pk, tied[1].pk, self.review.pk])
+
+    def test_batch_rejects_bad_payloads(self):
+        url = reverse('batch-like-reviews')
+        for payload in ([self.review.pk], {'like': self.review.pk}, 'like'):
+            self.assertEqual(self.api.post(url, payload, format='json').status_code, 400, payload)
+        too_many = {'like': list(range(MAX_BATCH_LIKES + 1))}
+        self.assertEqual(self.api.post(url, too_many, format='json').status_code, 400)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class EmbeddedCommentsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('commenter@example.com', 'commenter', 'password')
+        self.review = Review.objects.create(movie_title='Up', review_content='Good', rating=4, user=self.user)
+        self.comments = [
+            ReviewComment.objects.create(review=self.review, user=self.user, comment=f'Comment {n}') for n in range(5)
+        ]
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def embedded(self, **params):
+        review, = self.client.get(reverse('review-list'), params).json()['results']
+        return review
+
+    def test_latest_comments_are_embedded_with_a_link_to_the_rest(self):
+        review = self.embedded()
+        self.assertEqual([comment['comment'] for comment in review['comments']], ['Comment 4', 'Comment 3', 'Comment 2'])
+        self.assertEqual(review['comment_count'], 5)
+        self.assertTrue(review['comments_url'].endswith(reverse('review-comment-list', args=[self.review.pk])))
+        self.assertTrue(review['comments_url'].startswith('http://'))
+
+    @override_settings(REVIEW_COMMENTS_MAX_EMBEDDED=4)
+    def test_comments_parameter_is_clamped(self):
+        self.assertEqual(len(self.embedded(comments=1)['comments']), 1)
+        self.assertEqual(len(self.embedded(comments=50)['comments']), 4)
+        self.assertEqual(self.embedded(comments=0)['comments'], [])
+        self.assertEqual(self.embedded(comments=-2)['comments'], [])
+        self.assertEqual(len(self.embedded(comments='many')['comments']), 3)  # Invalid: the default
+
+    def test_comment_pages_are_stable_under_inserts(self):
+        url = reverse('review-comment-list', args=[self.review.pk])
+        page = self.api.get(url, {'page_size': 2}).json()
+        seen = [comment['id'] for comment in page['results']]
+        ReviewComment.objects.create(review=self.review, user=self.user, comment='Newer')  # Lands before page 1
+        while page['next']:
+            page = self.api.get(page['next']).json()
+            seen += [comment['id'] for comment in page['results']]
+        self.assertEqual(seen, [comment.pk for comment in reversed(self.comments)])  # None repeated or skipped
+
+
+class ReviewSearchTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        user = User.objects.create_user('search@example.com', 'search', 'password')
+        for title, content in [('Up', 'A balloon house'), ('Heat', 'Up all night'), ('Alien', 'In space')]:
+            Review.objects.create(movie_title=title, review_content=content, rating=4, user=user)
+
+    def test_full_text_matches_ranked_by_relevance(self):
+        self.assertTrue(search.fts_available('default'))
+        results = self.client.get(reverse('review-list'), {'search': 'up'}).json()['results']
+        self.assertEqual([review['movie_title'] for review in results], ['Up', 'Heat'])  # Title matches first
+
+    def test_punctuation_only_search_finds_nothing(self):
+        response = self.client.get(reverse('review-list'), {'search': '"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_probe_is_repeated_after_migrate(self):
+        search._fts_available[('default', str(connection.settings_dict['NAME']))] = False
+        reprobe_search_index_after_migrate(sender=None)
+        self.assertTrue(search.fts_available('default'))
+
+
+class ReviewExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin@example.com', 'admin', 'password', is_staff=True)
+        movie = Movie.objects.create(title='Up', lookup_key='up', details={'Title': 'Up'}, fetched_at=timezone.now())
+        for rating in (3, 5):
+            Review.objects.create(movie=movie, movie_title='Up', review_content='Good', rating=rating, user=self.admin)
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def test_ndjson_streams_every_review(self):
+        response = self.api.get(reverse('export-reviews', args=['ndjson']))
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['rating'] for row in rows], [3, 5])
+        self.assertEqual(rows[0]['username'], 'admin')
+
+    def test_csv_with_filter(self):
+        response = self.api.get(reverse('export-reviews', args=['csv']), {'rating': 5}, HTTP_ACCEPT='text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:4], ['id', 'movie_title', 'review_content', 'rating'])
+        self.assertEqual(len(lines), 2)
+
+    def test_invalid_rating_is_rejected(self):
+        for rating in ('abc', '\u00b2'):  # '²'.isdigit() is True, but it is not a number
+            response = self.api.get(reverse('export-reviews', args=['csv']), {'rating': rating})
+            self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        api = APIClient()
+        api.force_authenticate(User.objects.create_user('user@example.com', 'user', 'password'))
+        self.assertEqual(api.get(reverse('export-reviews', args=['csv'])).status_code, 403)
+
+
+class ImportReviewsTests(TestCase):
+    def test_imports_valid_rows_and_rejects_the_rest(self):
+        user = User.objects.create_user('reader@example.com', 'reader', 'password')
+        rows = [
+            {'movie_title': 'Up', 'review_content': 'Good', 'rating': 4, 'email': 'READER@example.com',
+             'created_at': '2020-05-01T12:00:00+00:00'},
+            {'movie_title': 'Up', 'review_content': 'Great', 'rating': 5, 'username': 'reader'},
+            {'movie_title': 'Up', 'review_content': 'Bad', 'rating': 9, 'username': 'reader'},
+            {'movie_title': 'Up', 'review_content': 'Who?', 'rating': 3, 'username': 'nobody'},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reviews.ndjson')
+            with open(path, 'w') as f:
+                f.writelines(json.dumps(row) + '\n' for row in rows)
+                f.write('not json\n')
+            call_command('import_reviews', path, batch_size=2, stdout=io.StringIO())
+            with open(path + '.rejected.ndjson') as f:
+                errors = [json.loads(line)['error'] for line in f]
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(list(Review.objects.filter(user=user).order_by('rating').values_list('rating', flat=True)), [4, 5])
+        self.assertEqual(Review.objects.get(rating=4).created_at.year, 2020)
+        self.assertEqual(Movie.objects.get(lookup_key='up').stats.review_count, 2)
+        # The model's auto_now/auto_now_add flags are left alone
+        self.assertTrue(Review._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(Review._meta.get_field('updated_at').auto_now)
+
+    def test_rejects_ndjson_values_of_the_wrong_type(self):
+        User.objects.create_user('reader@example.com', 'reader', 'password')
+        valid = {'movie_title': 'Up', 'review_content': 'Good', 'rating': 4, 'username': 'reader'}
+        rows = [
+            {**valid, 'poster_url': 5},
+            {**valid, 'created_at': 1588334400},
+            {**valid, 'username': ['reader']},
+            {**valid, 'movie_title': {'title': 'Up'}},
+            {**valid, 'rating': 4.7},
+            {**valid, 'rating': True},
+            {**valid, 'rating': '\u00b2'},
+            valid,
+            {**valid, 'rating': '3'},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reviews.ndjson')
+            with open(path, 'w') as f:
+                f.writelines(json.dumps(row) + '\n' for row in rows)
+            call_command('import_reviews', path, stdout=io.StringIO())
+            with open(path + '.rejected.ndjson') as f:
+                errors = [json.loads(line)['error'] for line in f]
+
+        self.assertEqual(errors, [
+            'poster_url must be a string', 'created_at must be a string',
+            'username must be a string', 'movie_title must be a string',
+            'rating must be a whole number', 'rating must be a whole number', 'rating must be a whole number',
+        ])
+        self.assertEqual(sorted(Review.objects.values_list('rating', flat=True)), [3, 4])
+
+    def test_bulk_create_can_keep_timestamps(self):
+        user = User.objects.create_user('history@example.com', 'history', 'password')
+        then = timezone.now().replace(year=2020)
+        review, = Review.objects.bulk_create([
+            Review(movie_title='Up', review_content='Good', rating=4, user=user, created_at=then, updated_at=then),
+        ], keep_timestamps=True)
+        self.assertEqual(review.created_at, then)
+        self.assertEqual(Review.objects.values_list('created_at', 'updated_at').get(pk=review.pk), (then, then))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(TestCase):
+    def test_reads_opt_in_and_writes_stay_on_primary(self):
+        router = ReplicaRouter()
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.assertIsNone(router.db_for_read(Review))
+        replica_reads(lambda request: self.assertEqual(router.db_for_read(Review), 'replica1'))(request)
+        self.assertEqual(router.db_for_write(Review), 'default')
+        self.assertIsNone(router.db_for_read(Review))
+
+    def test_cache_misses_are_built_from_the_primary(self):
+        get_cache().clear()
+        router = ReplicaRouter()
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        databases = []
+
+        def view(request):
+            databases.append(router.db_for_read(Review))
+            cached_payload('replica-test', ['replica-test'], lambda: databases.append(router.db_for_read(Review)) or 1)
+        replica_reads(view)(request)
+        self.assertEqual(databases, ['replica1', None])
+
+    def test_writers_are_pinned_to_primary(self):
+        user = User.objects.create_user('writer@example.com', 'writer', 'password')
+        post = RequestFactory().post('/reviews/create/')
+        post.user = user
+        response = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=201))(post)
+        self.assertIn('replica_pin', response.cookies)
+
+        get = RequestFactory().get('/reviews/')  # No cookie: an API client using JWT
+        get.user = user
+        self.assertFalse(reads_from_replica(get))
+        get.user = AnonymousUser()
+        self.assertTrue(reads_from_replica(get))
+
+    def test_per_process_pin_cache_is_flagged(self):
+        self.assertEqual(check_replica_pin_cache(None), [])  # The file cache every worker sees
+        with override_settings(REPLICA_PIN_CACHE_ALIAS='default'):
+            self.assertEqual([warning.id for warning in check_replica_pin_cache(None)], ['app.W003'])
+
+
+class BenchmarkConcurrencyTests(TestCase):
+    def test_refuses_to_write_without_confirmation(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_concurrency', stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+
+    def test_smoke(self):
+        # Clients that stop at once: no queries from the other processes, which cannot see this test's rows
+        out = io.StringIO()
+        call_command('benchmark_concurrency', clients=2, duration=0, reviews=3, allow_writes=True, stdout=out)
+        self.assertIn('2 clients', out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='bench-').exists())  # Cleaned up
+
+
+class AuthUserCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        backends._revocation_checks.clear()
+        # A fresh revocation store for each test (the runner already keeps the real one out of the suite)
+        revocations = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, revocations, True)
+        override = override_settings(CACHES={**settings.CACHES, 'revocations': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': revocations,
+        }})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('auth@example.com', 'auth', 'password')
+
+    def client_request(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        return request
+
+    def user_queries(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        return response, [query['sql'] for query in queries.captured_queries if User._meta.db_table in query['sql']]
+
+    def test_jwt_user_is_cached_until_saved(self):
+        token = self.client.post('/auth', {'email': 'auth@example.com', 'password': 'password'}).json()['access']
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        api.get(reverse('review-list'))
+        response, queries = self.user_queries(lambda: api.get(reverse('review-list')))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(api.get(reverse('review-list')).status_code, 401)
+
+    def test_session_user_is_cached_and_failed_logins_stop_early(self):
+        self.assertTrue(self.client.login(email='auth@example.com', password='password'))
+        self.client.get(reverse('most_reviewed_movies'))
+        response, queries = self.user_queries(lambda: self.client.get(reverse('most_reviewed_movies')))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertEqual(queries, [])
+
+        _, queries = self.user_queries(lambda: authenticate(email='nobody@example.com', password='password'))
+        self.assertEqual(len(queries), 1)  # A failed email login is not tried again by ModelBackend
+
+    def test_sessions_from_model_backend_survive(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertTrue(self.client.get(reverse('most_reviewed_movies')).wsgi_request.user.is_authenticated)
+
+    def test_session_sees_changes_saved_by_another_process(self):
+        self.assertTrue(self.client.login(email='auth@example.com', password='password'))
+        self.assertTrue(self.client.get(reverse('most_reviewed_movies')).wsgi_request.user.is_authenticated)
+        self.client.get(reverse('most_reviewed_movies'))  # A cache hit: reads the user's markers
+        # Another process changes the password: its cache delete never reaches this one, its revocation does
+        User.objects.filter(pk=self.user.pk).update(password=make_password('changed'))
+        revoke_user_tokens(self.user.pk)
+        with mock.patch.object(backends, 'revocation_cache') as revocation_cache:
+            get_user(self.client_request())
+        revocation_cache.assert_not_called()  # Markers were read less than AUTH_REVOCATION_CHECK_INTERVAL ago
+
+        backends._revocation_checks.clear()  # The interval has passed
+        self.assertFalse(get_user(self.client_request()).is_authenticated)  # The old session's password hash no longer matches
+
+    def test_claim_changes_keep_tokens_unless_requests_trust_the_claims(self):
+        token = self.client.post('/auth', {'email': 'auth@example.com', 'password': 'password'}).json()['access']
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        api.get(reverse('review-list'))
+        stale = caches['default'].get(f'auth:user:{self.user.pk}')  # As another process cached it
+
+        self.user.username = 'renamed'
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        caches['default'].set(f'auth:user:{self.user.pk}', stale)
+        backends._revocation_checks.clear()  # AUTH_REVOCATION_CHECK_INTERVAL has passed
+        response = api.get(reverse('review-list'))
+        self.assertEqual(response.status_code, 200)  # Still logged in
+        self.assertEqual(response.wsgi_request.user.username, 'renamed')  # The stale copy was reloaded
+
+        with override_settings(JWT_TOKEN_USERS=True):
+            self.user.is_staff = True
+            self.user.save()
+        self.assertEqual(api.get(reverse('review-list')).status_code, 401)
+
+    @override_settings(JWT_TOKEN_USERS=True)
+    def test_token_user_needs_no_query_and_honours_revocation(self):
+        token = self.client.post('/auth', {'email': 'auth@example.com', 'password': 'password'}).json()['access']
+        request = RequestFactory().get('/reviews/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(0):
+            user, validated_token = TokenUserJWTAuthentication().authenticate(request)
+        self.assertEqual(user, self.user)
+        self.assertEqual((user.username, user.is_staff), ('auth', False))
+        self.assertNotIn('email', validated_token)  # Readable by anyone holding the token
+
+        self.user.is_staff = True  # A changed claim revokes the user's earlier tokens
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            TokenUserJWTAuthentication().authenticate(request)
+
+    def test_logout_revokes_the_refresh_token_too(self):
+        tokens = self.client.post('/auth', {'email': 'auth@example.com', 'password': 'password'}).json()
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(api.post(reverse('revoke-token')).status_code, 204)
+        self.assertEqual(api.get(reverse('review-list')).status_code, 401)
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+
+@isolated_omdb_cache
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class AsyncReadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = OMDbStubServer({'Up': {'Title': 'Up', 'Year': '2009', 'Response': 'True'}}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        omdb.movie_cache.clear()
+        omdb.set_client(omdb.OMDbClient(base_url=self.stub.url, retries=0))
+        self.addCleanup(omdb.set_client, None)
+        user = User.objects.create_user('async@example.com', 'async', 'password')
+        movie = Movie.objects.create(title='Up', lookup_key='up')  # No details yet: OMDb is asked
+        self.reviews = [
+            Review.objects.create(movie=movie, movie_title='Up', review_content='Good', rating=rating, user=user)
+            for rating in (3, 5, 4)
+        ]
 
-    # Make a GET request to the view
-    response = self.client.get(reverse('most_reviewed_movies'))
+    def test_detail_awaits_omdb_and_stores_the_details(self):
+        response = self.client.get(reverse('review-detail-async', args=[self.reviews[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['movie_details']['Year'], '2009')
+        self.assertEqual(Movie.objects.get(lookup_key='up').details['Year'], '2009')
+        self.assertEqual(self.client.get(reverse('review-detail-async', args=[0])).status_code, 404)
 
-    # Assert that the correct template is used for authenticated users
-    self.assertTemplateUsed(response, 'most_reviewed_movies.html')
+    def test_list_matches_the_drf_view(self):
+        params = {'ordering': '-rating', 'page_size': 2}
+        expected = self.client.get(reverse('review-list'), params).json()
+        response = self.client.get(reverse('review-list-async'), params).json()
+        self.assertEqual(response['count'], expected['count'])
+        self.assertEqual(response['results'], expected['results'])
+        self.assertIsNotNone(response['next'])
+        self.assertEqual(self.client.get(reverse('review-list-async'), {'page': 9}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('review-list-async'), {'rating': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('review-list-async'), {'search': 'good'}).json()['count'], 3)
 
-    # Assert that the response contains the most reviewed movies
-    most_reviewed_movies = response.context['most_reviewed_movies']
-    self.assertEqual(len(most_reviewed_movies), 2)  # There should be two movies
-    self.assertEqual(most_reviewed_movies[0]['movie_title'], 'Movie 1')  # Movie 1 has more reviews
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_anonymous_reads_are_cached(self):
+        get_cache().clear()
+        url = reverse('review-list-async')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews[0].delete()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 2)
 
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_jwt_clients_are_authenticated(self):
+        get_cache().clear()
+        token = self.client.post('/auth', {'email': 'async@example.com', 'password': 'password'}).json()['access']
+        url = reverse('review-list-async')
+        self.client.get(url)  # Cached for anonymous users
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)  # Not the anonymous payload
+        self.assertEqual(response.wsgi_request.user.username, 'async')
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer nonsense').status_code, 401)
 
+    def test_detail_answers_304(self):
+        url = reverse('review-detail-async', args=[self.reviews[0].pk])
+        self.client.get(url)  # Stores the movie details, which are part of the version
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import register_user,my_login
-from .views import ReviewListView,my_logout,ReviewCommentListView,ReviewCommentCreateView ,ReviewCreateView,update_profile,most_reviewed_movies_view, ReviewDetailView, ReviewUpdateView, ReviewDeleteView ,like_review, unlike_review, MostLikedReviewsView ,profile_view
+from .views import ReviewListView,my_logout,ReviewCommentListView,ReviewCommentCreateView ,ReviewCreateView,update_profile,most_reviewed_movies_view, ReviewDetailView, ReviewUpdateView, ReviewDeleteView ,like_review, unlike_review, batch_like_reviews, ReviewExportView, MostLikedReviewsView ,profile_view, revoke_token_view
+from .views import review_list_async, review_detail_async, most_reviewed_movies_async
 
 urlpatterns = [
     # List all reviews
@@ -30,6 +31,15 @@ urlpatterns = [
     # To unlike a movie based on the review id
     path('reviews/<int:pk>/unlike/', unlike_review, name='unlike-review'),
 
+    # To like and unlike many reviews in one request
+    path('reviews/batch/like/', batch_like_reviews, name='batch-like-reviews'),
+
+    # Stream all reviews as reviews.ndjson or reviews.csv (staff only)
+    path('reviews/export.<str:file_format>', ReviewExportView.as_view(), name='export-reviews'),
+
+    # Revoke the JWT access token sent with the request (logout)
+    path('auth/revoke', revoke_token_view, name='revoke-token'),
+
     # To see the likes of a movie
     path('reviews/likes/<str:movie_title>/', MostLikedReviewsView.as_view(), name='most-liked-reviews'),
 
@@ -51,6 +61,11 @@ urlpatterns = [
     # URL for logout the user
     path('logout/', my_logout, name='logout'),
 
+    # Async variants of the review list, review detail and home page, for ASGI servers
+    path('async/reviews/', review_list_async, name='review-list-async'),
+    path('async/reviews/<int:pk>/', review_detail_async, name='review-detail-async'),
+    path('async/', most_reviewed_movies_async, name='most_reviewed_movies_async'),
+
 ]
 
 
@@ -2,26 +2,45 @@
 from django.shortcuts import render, redirect, get_object_or_404  # For rendering templates and handling 404 errors
 from django.contrib.auth import authenticate, login, logout, get_user_model  # For authentication functionalities
 from django.urls import reverse  # For URL handling and redirection
-from django.db.models import Count, Avg  # For aggregation functions (Count, Avg)
+from django.db.models import F, Prefetch  # Field references and prefetching
+from django.db import transaction, IntegrityError  # Atomic writes; racing profile creation
+from django.forms.models import construct_instance  # Apply a form to the profile a racing request created
+from django.http import StreamingHttpResponse, JsonResponse  # Streamed exports and async view responses
+from django.views.decorators.http import require_GET  # Read-only async endpoints
 from django.contrib.auth.decorators import login_required  # For restricting access to logged-in users
+from django.conf import settings  # Project settings (e.g. asynchronous enrichment)
 
 # DRF (Django REST Framework) imports
-from rest_framework import status, generics, filters  # Status codes, generics for CBVs, and search filtering
+from rest_framework import status, generics  # Status codes and generics for CBVs
 from rest_framework.response import Response  # For sending API responses
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated  # Permissions for API views
-from rest_framework.pagination import PageNumberPagination  # Pagination functionality
+from rest_framework.views import APIView  # Base class for the export view
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser  # Permissions for API views
+from rest_framework.pagination import CursorPagination  # Pagination functionality
 from rest_framework.filters import OrderingFilter  # Filtering results based on fields
 from rest_framework.decorators import api_view, permission_classes  # For function-based views with permissions
-from rest_framework.exceptions import PermissionDenied  # To raise permission-related exceptions
+from rest_framework.exceptions import APIException, NotFound, PermissionDenied  # API errors, also answered by the async views
+from rest_framework.request import Request  # Query parameters for the async list's filters
 
 # Third-party imports
+from rest_framework_simplejwt.exceptions import TokenError  # Invalid refresh token on logout
+from rest_framework_simplejwt.settings import api_settings as jwt_settings  # USER_ID_CLAIM
+from rest_framework_simplejwt.tokens import RefreshToken  # Refresh token sent on logout
+from asgiref.sync import sync_to_async  # Run the cached leaderboard build off the event loop
 from django_filters.rest_framework import DjangoFilterBackend  # Django filters for filtering queries
 
 # Local app imports (models, serializers, forms)
-from .models import Review  # Import the Review model
-from .serializers import ReviewSerializer, UserSerializer, ReviewDetailSerializer  # Serializers for API views
+from .models import Review, Movie, MovieStats  # Import the Review, Movie and leaderboard models
+from .serializers import ReviewSerializer, UserSerializer, ReviewDetailSerializer, embedded_comments_limit  # Serializers for API views
 from .forms import LoginForm  # Form for handling login
-from .serializers import fetch_movie_details  # Custom function for fetching movie details
+from .tasks import enqueue_enrich_movie, enqueue_enrich_movies  # Background poster/metadata enrichment
+from .pagination import AsyncPageNumberPagination, KeysetPagination  # Awaitable page numbers, keyset (cursor) pagination
+from .search import ReviewSearchFilter  # Full-text ?search=
+from .conditional import ConditionalReviewMixin, conditional_review  # ETag/Last-Modified and 304 answers
+from .export import EXPORT_FORMATS, ExportContentNegotiation, export_queryset, export_rows, export_lines  # Streamed review exports
+from .routers import ReplicaReadMixin, replica_reads  # Send read traffic to the replicas
+from .caching import CachedResponseMixin, cached_payload, acached_payload, review_scope, REVIEWS, LEADERBOARD, MOVIES  # Response cache
+from .authentication import revoke_token  # JWT logout
+from .omdb import afetch_movie_details  # Non-blocking OMDb lookups for the async views
 
 # Profile-related imports
 from userprofile.forms import ProfileForm  # Form for handling user profiles
@@ -33,17 +52,44 @@ from reviewcomment.serializers import ReviewCommentSerializer  # Serializer for
 
 User=get_user_model()
 
-def most_reviewed_movies_view(request):
-    # Query to get movie titles along with their review count and poster_url
-    most_reviewed_movies = Review.objects.values('movie_title', 'poster_url').annotate(
-        review_count=Count('id'),
-        average_rating=Avg('rating')
-    ).order_by('-review_count')  # Order by number of reviews in descending order
+
+def reviews_with_comments(queryset=None, comments_limit=None):
+    """
+    Load reviews with everything their serializers touch (author, movie and
+    the latest `comments_limit` comments with their authors), so a page costs
+    the same number of queries whatever its size or discussion volume.
+    """
+    if queryset is None:
+        queryset = Review.objects.all()
+    if comments_limit is None:
+        comments_limit = settings.REVIEW_COMMENTS_EMBEDDED
+    queryset = queryset.select_related('user', 'movie')
+    if not comments_limit:
+        return queryset
+    latest_comments = ReviewComment.objects.select_related('user').order_by('-created_at', '-id')[:comments_limit]
+    return queryset.prefetch_related(Prefetch('comments', queryset=latest_comments, to_attr='latest_comments'))
+
+
+def leaderboard():
+    # Read the precomputed leaderboard instead of aggregating every review
+    most_reviewed_movies = list(MovieStats.objects.filter(review_count__gt=0).order_by('-review_count').values(  # Order by number of reviews in descending order
+        'review_count', 'average_rating', movie_title=F('movie__title'), poster_url=F('movie__poster')
+    ))
 
     # Ensure average_rating is rounded to one decimal and out of 5
     for movie in most_reviewed_movies:
         if movie['average_rating']:
             movie['average_rating'] = round(min(movie['average_rating'], 5), 1)  # Ensure it's capped at 5
+    return most_reviewed_movies
+
+
+@replica_reads
+def most_reviewed_movies_view(request):
+    # The leaderboard is the same for every visitor, so it is cached whoever asks
+    if settings.RESPONSE_CACHE_ENABLED:
+        most_reviewed_movies = cached_payload('most_reviewed_movies', [LEADERBOARD], leaderboard)[0]
+    else:
+        most_reviewed_movies = leaderboard()
 
     # Determine which template to render based on user's authentication status
     template = 'most_reviewed_movies.html' if request.user.is_authenticated else 'most_reviewed_movies_anonymous.html'
@@ -63,34 +109,62 @@ class ReviewCommentCreateView(generics.CreateAPIView):
         # Retrieve the review object
         review = get_object_or_404(Review, pk=review_id)
 
-        # Save the comment, associating it with the user and the review
-        serializer.save(user=self.request.user, review=review)
+        # Save the comment, associating it with the user and the review; the signals count it
+        # and touch the review in the same transaction
+        with transaction.atomic():
+            serializer.save(user=self.request.user, review=review)
 
-class ReviewCommentListView(generics.ListAPIView):
+class CommentCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')  # Newest first, matching the comments embedded in reviews
+
+class ReviewCommentListView(ReplicaReadMixin, ConditionalReviewMixin, generics.ListAPIView):
     serializer_class = ReviewCommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CommentCursorPagination
 
     def get_queryset(self):
         # Get the 'review_id' from the URL kwargs
         review_id = self.kwargs.get('pk')
-        # Filter comments by review_id
-        return ReviewComment.objects.filter(review__id=review_id)
+        # Filter comments by review_id, loading the author and review in the same query
+        return ReviewComment.objects.filter(review__id=review_id).select_related('user', 'review')
+
+
 
+def save_profile_form(form):
+    """
+    Save a validated ProfileForm, writing only the fields that changed. If a
+    concurrent first save (e.g. a double submit) created the profile in the
+    meantime, the form's data goes onto that profile instead.
+    """
+    profile = form.instance
+    if profile._state.adding:
+        try:
+            with transaction.atomic():  # A failed insert must not break the request's transaction
+                return form.save()
+        except IntegrityError:
+            profile = construct_instance(form, Profile.objects.get(user_id=profile.user_id))
+    if changed := profile.changed_fields():
+        profile.save(update_fields=changed)
+    return profile
 
 
 @login_required
 def update_profile(request):
-    # Get the profile for the logged-in user or create one if it doesn't exist
-    profile, created = Profile.objects.get_or_create(user=request.user)
+    # Get the profile for the logged-in user in one query; users from before profiles
+    # were created on sign-up get theirs when they first save the form
+    profile = Profile.objects.filter(user_id=request.user.pk).first() or Profile(user=request.user)
 
     # Ensure that the current user is the owner of the profile
-    if profile.user != request.user:
+    if profile.user_id != request.user.pk:
         raise PermissionDenied("You do not have permission to update this profile.")
 
     if request.method == 'POST':
         form = ProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            save_profile_form(form)
             return redirect('review-list')  # Change 'review-list' to the appropriate profile view if necessary
     else:
         form = ProfileForm(instance=profile)
@@ -100,7 +174,7 @@ def update_profile(request):
 
 @login_required
 def profile_view(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(User.objects.select_related('profile'), username=username)  # The template shows the profile
     reviews = user.reviews.all()  # Get all reviews submitted by this user
     context = {
         'user': user,
@@ -112,41 +186,117 @@ def profile_view(request, username):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def like_review(request, pk):
-    try:
-        review = Review.objects.get(pk=pk)
-    except Review.DoesNotExist:
+    liked, like_count = Review.objects.add_like(pk, request.user.pk)
+    if like_count is None:
         return Response({'error': 'Review not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.user in review.liked_by.all():
-        return Response({'error': 'You already liked this review'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Add user to liked_by field
-    review.liked_by.add(request.user)
+    if not liked:
+        return Response({'error': 'You already liked this review', 'like_count': like_count}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Explicitly return only the success message
-    return Response({'message': 'Review liked successfully'}, status=status.HTTP_200_OK)
+    return Response({'message': 'Review liked successfully', 'like_count': like_count}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def unlike_review(request, pk):
-    try:
-        review = Review.objects.get(pk=pk)
-    except Review.DoesNotExist:
+    unliked, like_count = Review.objects.remove_like(pk, request.user.pk)
+    if like_count is None:
         return Response({'error': 'Review not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.user not in review.liked_by.all():
-        return Response({'error': 'You have not liked this review'}, status=status.HTTP_400_BAD_REQUEST)
+    if not unliked:
+        return Response({'error': 'You have not liked this review', 'like_count': like_count}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'message': 'Review unliked successfully', 'like_count': like_count}, status=status.HTTP_200_OK)
+
+MAX_BATCH_LIKES = 100
 
-    review.liked_by.remove(request.user)
-    return Response({'message': 'Review unliked successfully'}, status=status.HTTP_200_OK)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch_like_reviews(request):
+    """
+    Like and unlike many reviews in one request:
+    {"like": [1, 2], "unlike": [3]} -> one result per review id.
+    """
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Expected an object with "like" and/or "unlike" lists'}, status=status.HTTP_400_BAD_REQUEST)
+    like_ids = request.data.get('like', [])
+    unlike_ids = request.data.get('unlike', [])
+    if not isinstance(like_ids, list) or not isinstance(unlike_ids, list):
+        return Response({'error': '"like" and "unlike" must be lists of review ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(like_ids) + len(unlike_ids) > MAX_BATCH_LIKES:
+        return Response({'error': f'At most {MAX_BATCH_LIKES} reviews per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = []
+    for action, review_ids in (('like', like_ids), ('unlike', unlike_ids)):
+        for review_id in review_ids:
+            if not isinstance(review_id, int) or isinstance(review_id, bool):  # true is not review 1
+                results.append({'id': review_id, 'action': action, 'error': 'Invalid review id'})
+                continue
+            if action == 'like':
+                changed, like_count = Review.objects.add_like(review_id, request.user.pk)
+            else:
+                changed, like_count = Review.objects.remove_like(review_id, request.user.pk)
+            if like_count is None:
+                results.append({'id': review_id, 'action': action, 'error': 'Review not found'})
+            else:
+                results.append({'id': review_id, 'action': action, 'changed': changed, 'like_count': like_count})
+
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+class ReviewExportView(APIView):
+    """
+    Stream every review as NDJSON or CSV (optionally ?movie_title= / ?rating=).
+    Rows are read from a database cursor in chunks and sent as they are
+    produced, so memory stays flat however many reviews there are.
+    """
+    permission_classes = [IsAdminUser]
+    content_negotiation_class = ExportContentNegotiation
+
+    def get(self, request, file_format):
+        if file_format not in EXPORT_FORMATS:
+            return Response({'error': f'Unknown export format: {file_format}'}, status=status.HTTP_404_NOT_FOUND)
+        rating = request.query_params.get('rating') or None
+        if rating:
+            # Checked here: the queryset only runs once the response is streaming
+            try:
+                rating = int(rating)
+            except ValueError:
+                return Response({'error': 'rating must be a whole number'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = export_queryset(request.query_params.get('movie_title'), rating)
+        response = StreamingHttpResponse(export_lines(file_format, export_rows(queryset)), content_type=EXPORT_FORMATS[file_format])
+        response['Content-Disposition'] = f'attachment; filename="reviews.{file_format}"'
+        return response
 
-class MostLikedReviewsView(generics.ListAPIView):
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def revoke_token_view(request):
+    # JWT logout: the access token used for this request, its login's refresh token and every
+    # access token minted from it are rejected from now on. A `refresh` token can be sent too.
+    if not hasattr(request.auth, 'payload'):
+        return Response({'error': 'Only JWT access tokens can be revoked.'}, status=status.HTTP_400_BAD_REQUEST)
+    tokens = [request.auth]
+    if request.data.get('refresh'):
+        try:
+            refresh = RefreshToken(request.data['refresh'])
+        except TokenError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            raise PermissionDenied('This refresh token belongs to another user.')
+        tokens.append(refresh)
+    for token in tokens:
+        revoke_token(token)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+class MostLikedReviewsView(ReplicaReadMixin, CachedResponseMixin, generics.ListAPIView):
     serializer_class = ReviewSerializer
 
     def get_queryset(self):
         movie_title = self.kwargs['movie_title']
-        # Annotate each review with the number of likes and order by like count
-        return Review.objects.filter(movie_title=movie_title).annotate(like_count=Count('liked_by')).order_by('-like_count')
+        # Order by the stored like counter, ties broken by id so pages neither repeat nor skip rows
+        # (indexed together with movie_title)
+        return reviews_with_comments(
+            Review.objects.filter(movie_title=movie_title).order_by('-like_count', '-id'),
+            embedded_comments_limit(self.request),
+        )
 
 def my_login(request):
     form = LoginForm()
@@ -175,22 +325,42 @@ def my_logout(request):
 
 
 
-class ReviewPagination(PageNumberPagination):
+class ReviewPagination(AsyncPageNumberPagination):
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class ReviewKeysetPagination(KeysetPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 100
+    keyset_fields = ('created_at', 'rating')  # Each backed by a (field, id) index
+    default_ordering = '-created_at'
 
 # List all reviews (GET)
-class ReviewListView(generics.ListAPIView):
+class ReviewListView(ReplicaReadMixin, CachedResponseMixin, generics.ListAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     pagination_class = ReviewPagination
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, OrderingFilter ,filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ReviewSearchFilter]
     filterset_fields = ['movie_title', 'rating']
     ordering_fields = ['rating', 'created_at']
     ordering = ['-created_at']
-    search_fields = ['movie_title','rating' ]
+    search_fields = ['movie_title', 'review_content']  # Used only where no full-text index is available
+
+    def get_queryset(self):
+        return reviews_with_comments(super().get_queryset(), embedded_comments_limit(self.request))
+
+    @property
+    def paginator(self):
+        # ?pagination=cursor switches to keyset pages, which stay constant-time however deep the client goes
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = ReviewKeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
 
 # Create a review (POST)
@@ -200,26 +370,32 @@ class ReviewCreateView(generics.CreateAPIView):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
 
-    # Fetch movie data from OMDB
+    # Fetch movie data from the local Movie table, asking OMDb only the first time a title is seen
     def fetch_movie_data(self, movie_title):
-        movie_data = fetch_movie_details(movie_title)
+        movie = Movie.objects.for_title(movie_title)
+        movie_data = movie.get_details()
         if movie_data and 'Poster' in movie_data:
             return movie_data['Poster']  # Return the poster URL
         return None
 
     def perform_create(self, serializer, movie_title=None):
+        if settings.ENRICH_REVIEWS_ASYNC and movie_title:
+            # Save with whatever is already known about the movie; the worker fetches the rest
+            movie = Movie.objects.for_title(movie_title)
+            serializer.save(user=self.request.user, movie=movie, poster_url=movie.poster)
+            if movie.needs_refresh():
+                enqueue_enrich_movie(movie)
+            return
         # Fetch the movie's poster URL if the movie title is provided
         poster_url = self.fetch_movie_data(movie_title) if movie_title else None
         # Save the review with the user and poster URL (for single object creation)
         serializer.save(user=self.request.user, poster_url=poster_url)
 
     def perform_bulk_create(self, serializer):
-        # Save multiple objects (bulk create) and fetch poster URLs for each review
-        for item in serializer.validated_data:
-            movie_title = item.get('movie_title')
-            poster_url = self.fetch_movie_data(movie_title)
-            item['poster_url'] = poster_url  # Attach poster URL
-        serializer.save(user=self.request.user)
+        # ReviewListSerializer saves the whole list with one bulk INSERT
+        reviews = serializer.save(user=self.request.user)
+        if settings.ENRICH_REVIEWS_ASYNC:
+            enqueue_enrich_movies({review.movie for review in reviews if review.movie and review.movie.needs_refresh()})
 
     def create(self, request, *args, **kwargs):
         # Custom message for unauthenticated users
@@ -242,11 +418,17 @@ class ReviewCreateView(generics.CreateAPIView):
 
 
 # Retrieve a single review by ID (GET)
-class ReviewDetailView(generics.RetrieveAPIView):
+class ReviewDetailView(ReplicaReadMixin, ConditionalReviewMixin, CachedResponseMixin, generics.RetrieveAPIView):
     queryset = Review.objects.all()
     serializer_class = ReviewDetailSerializer
     permission_classes = []
 
+    def get_cache_scopes(self):
+        return [review_scope(self.kwargs['pk']), MOVIES]
+
+    def get_queryset(self):
+        return reviews_with_comments(super().get_queryset(), embedded_comments_limit(self.request))
+
 # Update a review by ID (PUT/PATCH)
 class ReviewUpdateView(generics.UpdateAPIView):
     queryset = Review.objects.all()
@@ -258,7 +440,7 @@ class ReviewUpdateView(generics.UpdateAPIView):
         instance = self.get_object()
 
         # Check if the request user is the creator of the review
-        if instance.user != request.user:
+        if instance.user_id != request.user.pk:
             raise PermissionDenied("You do not have permission to update this review.")
 
         # Perform the regular update process
@@ -285,7 +467,7 @@ class ReviewDeleteView(generics.DestroyAPIView):
         instance = self.get_object()
 
         # Check if the request user is the creator of the review
-        if instance.user != request.user:
+        if instance.user_id != request.user.pk:
             raise PermissionDenied("You do not have permission to delete this review.")
 
         # Perform the deletion
@@ -307,3 +489,78 @@ def register_user(request):
             # Redirect to the 'reviews' list view after successful registration
             return redirect('my_login')  # Use the reviews route defined in the router
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# Async (ASGI) read endpoints: the review detail, review list and home page for an ASGI server
+# (e.g. `uvicorn Movie_Review_API.asgi:application`). Queries go through the async ORM and OMDb
+# is awaited, so a worker keeps serving while many requests wait on a slow upstream.
+
+async def cached_json(request, name, scopes, build):
+    """
+    JSON response with the data returned by `await build()`, served from the
+    response cache for anonymous users like CachedResponseMixin does. API
+    errors raised by `build()` are answered the way DRF would.
+    """
+    try:
+        if request.user.is_authenticated or not settings.RESPONSE_CACHE_ENABLED:
+            return JsonResponse(await build())
+        # Pagination and comment links are absolute, so the host is part of the key
+        data, hit = await acached_payload(f'{name}:{request.get_host()}', scopes, build, request.GET)
+    except APIException as exc:
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return JsonResponse(detail, status=exc.status_code, safe=False)
+    response = JsonResponse(data)
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+@require_GET
+@replica_reads
+@conditional_review
+async def review_detail_async(request, pk):
+    async def build():
+        queryset = reviews_with_comments(Review.objects.filter(pk=pk), embedded_comments_limit(request))
+        review = await queryset.afirst()
+        if review is None:
+            raise NotFound('No Review matches the given query.')
+        if review.movie is None:
+            movie_details = await afetch_movie_details(review.movie_title)
+        else:
+            movie_details = await review.movie.aget_details()
+        return ReviewDetailSerializer(review, context={'request': request, 'movie_details': movie_details}).data
+
+    return await cached_json(request, f'review_detail_async:{pk}', [review_scope(pk), MOVIES], build)
+
+
+@require_GET
+@replica_reads
+async def review_list_async(request):
+    """
+    ReviewListView's filters, search, ordering and page numbers, taken from
+    the view itself; cursor pages stay on the DRF view.
+    """
+    async def build():
+        api_request = Request(request)
+        view = ReviewListView(request=api_request, args=(), kwargs={}, format_kwarg=None)
+        # Building the queryset may probe the full-text index, a blocking query
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+        paginator = ReviewPagination()
+        reviews = await paginator.apaginate_queryset(queryset, api_request, view)
+        data = ReviewSerializer(reviews, many=True, context={'request': api_request}).data
+        return paginator.get_paginated_response(data).data
+
+    return await cached_json(request, 'review_list_async', [REVIEWS], build)
+
+
+@require_GET
+@replica_reads
+async def most_reviewed_movies_async(request):
+    # The cached build may wait on another request's rebuild, so it runs in a thread
+    if settings.RESPONSE_CACHE_ENABLED:
+        most_reviewed_movies = (await sync_to_async(cached_payload)('most_reviewed_movies', [LEADERBOARD], leaderboard))[0]
+    else:
+        most_reviewed_movies = await sync_to_async(leaderboard)()
+    # replica_reads has already loaded the user
+    template = 'most_reviewed_movies.html' if request.user.is_authenticated else 'most_reviewed_movies_anonymous.html'
+    return render(request, template, {'most_reviewed_movies': most_reviewed_movies})
+
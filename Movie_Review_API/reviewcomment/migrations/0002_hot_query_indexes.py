@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_hot_query_indexes'),
+        ('reviewcomment', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Build the composite index before dropping the single-column one it replaces
+        migrations.AddIndex(
+            model_name='reviewcomment',
+            index=models.Index(fields=['review', '-created_at', '-id'], name='comment_review_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='reviewcomment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='app.review'),
+        ),
+    ]
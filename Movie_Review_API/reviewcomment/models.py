@@ -6,7 +6,14 @@ from app.models import User
 
 # Create your models here.
 class ReviewComment(models.Model):
-    review = models.ForeignKey(Review, related_name='comments', on_delete=models.CASCADE)
+    review = models.ForeignKey(Review, related_name='comments', on_delete=models.CASCADE, db_index=False)  # Covered by comment_review_created_idx
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     comment = models.TextField(null=True,blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Comments of a review, newest first (comment list and comments embedded in reviews)
+            models.Index(fields=['review', '-created_at', '-id'], name='comment_review_created_idx'),
+        ]
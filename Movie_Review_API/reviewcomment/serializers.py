@@ -7,5 +7,5 @@ class ReviewCommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ReviewComment
-        fields = ['id', 'review', 'username', 'comment', 'created_at']
-        read_only_fields = ['id', 'username', 'created_at','review']
+        fields = ['id', 'review', 'username', 'comment', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'username', 'created_at', 'updated_at', 'review']
@@ -1,10 +1,62 @@
-from app.models import User
+from app.models import User, TrackedFieldsMixin
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db import models
 
-class Profile(models.Model):
+class Profile(TrackedFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_picture', blank=True ,null=True)
+    # {'source': picture name, 'sizes': {size: {extension: name}}}, filled in by the thumbnail job
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+
+    tracked_fields = ('bio', 'profile_picture')
 
     def __str__(self):
-        return f"{self.user.username} - {self.bio}"
\ No newline at end of file
+        return f"{self.user.username} - {self.bio}"
+
+    def save(self, *args, **kwargs):
+        picture_replaced = 'profile_picture' in self.changed_fields()
+        # Read by the post_save receiver that queues the thumbnail job
+        self.picture_changed = picture_replaced and bool(self.profile_picture)
+        if self._state.adding or kwargs.get('force_insert'):
+            pass
+        elif picture_replaced:
+            self.thumbnails = {}  # Built from the previous picture
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'thumbnails'}
+        elif kwargs.get('update_fields') is None:
+            # The thumbnail job writes them; this instance may have been loaded before it finished
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'thumbnails' and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def thumbnail_url(self, size, extension):
+        # Only thumbnails built from the current picture count
+        if not self.profile_picture or self.thumbnails.get('source') != self.profile_picture.name:
+            return None
+        name = self.thumbnails.get('sizes', {}).get(str(size), {}).get(extension)
+        return default_storage.url(name) if name else None
+
+    @property
+    def picture(self):
+        """
+        Image sources for templates: the PROFILE_THUMBNAIL_DISPLAY_SIZE thumbnail,
+        with the next size up for high-density screens, as WebP and JPEG.
+        None until the thumbnails are built; templates then show the upload.
+        """
+        size = settings.PROFILE_THUMBNAIL_DISPLAY_SIZE
+        src = self.thumbnail_url(size, 'jpeg')
+        if src is None:
+            return None
+        larger = [other for other in settings.PROFILE_THUMBNAIL_SIZES if other > size]
+        srcsets = {}
+        for extension in ('webp', 'jpeg'):
+            srcset = [f'{self.thumbnail_url(size, extension)} 1x']
+            if larger and self.thumbnail_url(min(larger), extension):
+                srcset.append(f'{self.thumbnail_url(min(larger), extension)} {min(larger) / size:g}x')
+            srcsets[extension] = ', '.join(srcset)
+        return {'src': src, 'size': size, 'webp_srcset': srcsets['webp'], 'jpeg_srcset': srcsets['jpeg']}
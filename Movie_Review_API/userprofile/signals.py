@@ -1,13 +1,33 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from app.models import User
 from .models import Profile
+from .tasks import enqueue_profile_thumbnails
 
 @receiver(post_save, sender=User)
-def create_profile(sender, instance, created, **kwargs):
-    if created:
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    # Only new users need a profile written; fixtures bring their own
+    if created and not raw:
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def save_profile(sender, instance, created, **kwargs):
+    # Save a profile changed through user.profile along with the user, but never
+    # load one just to check (last_login updates on every login come through here)
+    related = User.profile.related
+    profile = related.get_cached_value(instance) if not created and related.is_cached(instance) else None
+    if profile is None:
+        return
+    if profile._state.adding:
+        profile.save()
+    elif changed := profile.changed_fields():
+        profile.save(update_fields=changed)
+
+@receiver(post_save, sender=Profile)
+def queue_thumbnails(sender, instance, using, **kwargs):
+    # Resized in the worker, once the new picture is committed
+    if getattr(instance, 'picture_changed', False):
+        # The picture saved now, not whatever the instance holds by commit time
+        profile_id, picture = instance.pk, instance.profile_picture.name
+        transaction.on_commit(lambda: enqueue_profile_thumbnails(profile_id, picture), using=using)
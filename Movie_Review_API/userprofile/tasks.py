@@ -0,0 +1,38 @@
+# Background job handlers, discovered by the `worker` management command
+
+import logging
+
+from PIL import UnidentifiedImageError
+
+from app.jobs import register, enqueue
+from .models import Profile
+from .thumbnails import make_thumbnails
+
+logger = logging.getLogger(__name__)
+
+PROFILE_THUMBNAILS = 'profile_thumbnails'
+
+
+@register(PROFILE_THUMBNAILS)
+def build_profile_thumbnails(profile_id, picture):
+    """
+    Build the thumbnails of a profile picture. Skipped when the picture has
+    been replaced or removed since the job was queued.
+    """
+    profile = Profile.objects.filter(pk=profile_id, profile_picture=picture).first()
+    if profile is None:
+        return
+    try:
+        thumbnails = make_thumbnails(profile.profile_picture)
+    except (OSError, UnidentifiedImageError):
+        logger.exception('Cannot build thumbnails for %s', picture)
+        return
+    # update() keeps the job from overwriting a picture changed while it ran
+    Profile.objects.filter(pk=profile_id, profile_picture=picture).update(
+        thumbnails={'source': picture, 'sizes': thumbnails},
+    )
+
+
+def enqueue_profile_thumbnails(profile_id, picture):
+    # One job per uploaded picture, so a new upload is not folded into a job already running for the old one
+    return enqueue(PROFILE_THUMBNAILS, f'{profile_id}:{picture}', {'profile_id': profile_id, 'picture': picture})
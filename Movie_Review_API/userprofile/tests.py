@@ -1,3 +1,117 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from PIL import Image
+
+from app.checks import check_media_serving
+from app.models import User, Job
+from Movie_Review_API import urls as project_urls
+from .models import Profile
+from .views import serve_media
+
+# The project routes /media/ only in DEBUG or with a web server handoff; these tests always do
+urlpatterns = [*project_urls.urlpatterns, path('media/<path:path>', serve_media)]
+
+
+class ProfileWriteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('profile@example.com', 'profile', 'password')
+
+    def profile_queries(self, action):
+        with CaptureQueriesContext(connection) as queries:
+            response = action()
+        return response, [query['sql'] for query in queries.captured_queries if Profile._meta.db_table in query['sql']]
+
+    def test_new_users_get_an_empty_profile_and_no_thumbnail_job(self):
+        # The receivers in signals.py are connected by UserprofileConfig.ready()
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual((profile.bio, bool(profile.profile_picture), profile.thumbnails), (None, False, {}))
+        self.assertFalse(Job.objects.exists())
+
+    def test_profile_created_with_user_and_left_alone_on_login(self):
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+        _, queries = self.profile_queries(lambda: self.client.login(email='profile@example.com', password='password'))
+        self.assertEqual(queries, [])  # The last_login update does not touch the profile
+
+    def test_update_profile_reads_once_and_writes_only_changes(self):
+        self.client.login(email='profile@example.com', password='password')
+        _, queries = self.profile_queries(lambda: self.client.get(reverse('profileform')))
+        self.assertEqual(len(queries), 1)
+
+        self.client.post(reverse('profileform'), {'bio': 'Film buff'})
+        self.assertEqual(Profile.objects.get(user=self.user).bio, 'Film buff')
+        _, queries = self.profile_queries(lambda: self.client.post(reverse('profileform'), {'bio': 'Film buff'}))
+        self.assertEqual(len(queries), 1, queries)  # Nothing changed: no UPDATE
+
+    def test_racing_first_saves_update_the_same_profile(self):
+        self.client.login(email='profile@example.com', password='password')
+        missing = Profile.objects.none()
+        # The view does not see the profile another request has just created
+        with mock.patch.object(Profile.objects, 'filter', return_value=missing):
+            response = self.client.post(reverse('profileform'), {'bio': 'Second'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Profile.objects.get(user=self.user).bio, 'Second')
+
+
+@override_settings(JOBS_RUN_EAGERLY=True, MEDIA_SERVING='django', ROOT_URLCONF=__name__)
+class ProfileThumbnailTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('thumbs@example.com', 'thumbs', 'password')
+        self.client.login(email='thumbs@example.com', password='password')
+
+    def upload(self, run_jobs=True):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), 'teal').save(buffer, 'PNG')
+        with self.captureOnCommitCallbacks(execute=run_jobs) as callbacks:
+            self.client.post(reverse('profileform'), {'bio': 'Hi', 'profile_picture': SimpleUploadedFile('me.png', buffer.getvalue())})
+        self.pending_callbacks = callbacks
+        return Profile.objects.get(user=self.user)
+
+    def test_upload_builds_thumbnails_served_with_long_cache(self):
+        profile = self.upload()
+        picture = profile.picture
+        self.assertIn('.webp 1x', picture['webp_srcset'])
+        self.assertIn('2x', picture['jpeg_srcset'])
+
+        response = self.client.get(picture['src'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(Image.open(BytesIO(b''.join(response.streaming_content))).size, (150, 150))
+        self.assertEqual(self.client.get('/media/..%2Fmanage.py').status_code, 404)
+
+    def test_web_server_sends_the_file(self):
+        profile = self.upload()
+        with override_settings(MEDIA_SERVING='x-accel-redirect'):
+            response = self.client.get(profile.profile_picture.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + profile.profile_picture.name)
+        self.assertEqual(response.content, b'')
+
+    def test_saving_a_stale_profile_keeps_the_thumbnails(self):
+        stale = self.upload(run_jobs=False)  # Loaded before the thumbnail job ran
+        for callback in self.pending_callbacks:
+            callback()
+        stale.bio = 'Changed'
+        stale.save()
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.bio, 'Changed')
+        self.assertIsNotNone(profile.picture)
+
+    def test_django_only_streams_media_in_debug(self):
+        self.assertEqual([warning.id for warning in check_media_serving(None)], ['app.W002'])
+        with override_settings(MEDIA_SERVING='x-sendfile'):
+            self.assertEqual(check_media_serving(None), [])
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_media_serving(None), [])
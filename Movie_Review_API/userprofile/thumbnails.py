@@ -0,0 +1,42 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = 'profile_thumbnails'
+
+# Pillow format name and save options per file extension
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def make_thumbnails(picture):
+    """
+    Resize an uploaded picture into square PROFILE_THUMBNAIL_SIZES thumbnails
+    in every format of FORMATS. Files are named after a hash of their
+    content, so they never change and can be cached forever. Returns
+    {size: {extension: storage name}}.
+    """
+    with picture.open('rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)  # Phone photos carry their rotation in EXIF
+        image = image.convert('RGB')
+
+    thumbnails = {}
+    for size in settings.PROFILE_THUMBNAIL_SIZES:
+        resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        thumbnails[str(size)] = {}
+        for extension, (image_format, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            content = buffer.getvalue()
+            name = f'{THUMBNAIL_DIR}/{hashlib.sha256(content).hexdigest()[:20]}-{size}.{extension}'
+            if not default_storage.exists(name):  # Same content, same name: nothing to write
+                default_storage.save(name, ContentFile(content))
+            thumbnails[str(size)][extension] = name
+    return thumbnails